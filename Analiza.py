@@ -1,45 +1,85 @@
 import pandas as pd 
 import numpy as np
-import matplotlib.pyplot as plt
-import pyarrow.parquet as pq 
-from fuzzywuzzy import fuzz
-from collections import defaultdict
-import re
+from Potrivire import ratio_pairs
+from statistics import NormalDist
+from Incarcare import DEFAULT_INPUT, load_table, parquet_columns
+from Rezolvare import select_columns_to_analyze
+from Tipuri import optimize_dtypes
+from Profiler import profile_columns
+from Export import open_workbook, write_sheet, write_table
+from Grafice import pyplot, seaborn
+from Instrumentare import pipeline, stage
 from datetime import datetime
-import seaborn as sns
+import sys
 
-def preprocess_text(text):
-    if pd.isna(text):
-        return ""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    return text.strip()
+def column_similarity(values1, values2, mode='sample', sample_size=2000, confidence=0.95, workers=-1, random_state=0):
+    """
+    Similaritatea medie (fuzz.ratio) între valorile a două coloane, comparate pe poziție.
 
-def analyze_excel_duplicates():
-    print("Începe analiza și deduplicarea datelor din Excel...")
+    mode='sample': estimează media pe un eșantion aleator de `sample_size` perechi și
+    returnează și intervalul de încredere (aproximare normală, cu corecție pentru
+    populație finită).
+    mode='exact': compară toate perechile cu rapidfuzz (Potrivire.ratio_pairs), în paralel
+    pe `workers` fire (-1 = toate nucleele); intervalul este chiar media.
+
+    Returnează (medie, limita inferioară, limita superioară, număr total de perechi).
+    """
+    total = min(len(values1), len(values2))
+    if total == 0:
+        return None
+    
+    if mode == 'exact' or sample_size >= total:
+        positions = np.arange(total)
+    else:
+        rng = np.random.default_rng(random_state)
+        positions = np.sort(rng.choice(total, size=sample_size, replace=False))
+    
+    scores = ratio_pairs([str(values1[i]) for i in positions],
+                         [str(values2[i]) for i in positions],
+                         workers=workers).astype(np.float64)
+    mean = scores.mean()
+    if len(positions) == total or len(scores) < 2:
+        return mean, mean, mean, total
+    
+    # Interval de încredere pentru media populației, din eșantion
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    finite_population = np.sqrt((total - len(scores)) / (total - 1))
+    margin = z * scores.std(ddof=1) / np.sqrt(len(scores)) * finite_population
+    return mean, mean - margin, mean + margin, total
+
+@pipeline('analyze_excel_duplicates')
+def analyze_excel_duplicates(input_path=DEFAULT_INPUT, export_excel=False,
+                             similarity_mode='sample', sample_size=2000, workers=-1, export_format='xlsx',
+                             key_columns=None, df=None):
+    """
+    Analiza duplicatelor și a similarității dintre coloanele cheie (implicit alese după
+    poziție, sau după nume prin `key_columns`). Un DataFrame deja încărcat poate fi dat
+    prin `df`, caz în care fișierul nu mai este citit.
+    """
+    print("Începe analiza și deduplicarea datelor...")
     
-    # Citim fișierul Excel
-    print("\nCitire fișier Excel...")
+    # Citim direct fișierul parquet (prin cache-ul Arrow), fără conversia în Excel
+    print("\nCitire fișier parquet...")
     try:
-        df = pd.read_excel('Tensorflow.xlsx')
+        schema_columns = parquet_columns(input_path) if df is None else list(df.columns)
+        
+        # Definim coloanele pentru analiză (literele coloanelor din Excel -> nume)
+        columns_to_analyze = select_columns_to_analyze(schema_columns, key_columns)
+        
+        # Fără exportul complet în Excel avem nevoie doar de coloanele analizate
+        if df is None:
+            with stage('read_parquet') as record:
+                table = load_table(input_path, columns=None if export_excel else list(columns_to_analyze.values()))
+                record['rows'] = table.num_rows
+            with stage('to_pandas', rows=table.num_rows):
+                df = table.to_pandas()
+        df = optimize_dtypes(df)
         print(f"Număr total de rânduri: {len(df)}")
-        print(f"Număr total de coloane: {len(df.columns)}")
+        print(f"Număr total de coloane: {len(schema_columns)}")
     except Exception as e:
-        print(f"Eroare la citirea fișierului Excel: {str(e)}")
+        print(f"Eroare la citirea fișierului parquet: {str(e)}")
         return
     
-    # Definim coloanele pentru analiză
-    columns_to_analyze = {
-        'A': df.columns[0],  # Prima coloană
-        'B': df.columns[1],  # A doua coloană
-        'C': df.columns[2],  # A treia coloană
-        'L': df.columns[11], # Coloana L
-        'M': df.columns[12], # Coloana M
-        'AL': df.columns[37], # Coloana AL
-        'AM': df.columns[38], # Coloana AM
-        'AN': df.columns[39]  # Coloana AN
-    }
-    
     print("\nColoanele analizate:")
     for col_letter, col_name in columns_to_analyze.items():
         print(f"Coloana {col_letter}: {col_name}")
@@ -48,62 +88,83 @@ def analyze_excel_duplicates():
     print("\nAnaliză pentru fiecare coloană:")
     column_stats = {}
     
+    # Profilăm toate coloanele o singură dată; rapoartele de mai jos refolosesc profilul
+    profiles = profile_columns(df, list(columns_to_analyze.values()))
+    
     for col_letter, col_name in columns_to_analyze.items():
+        profile = profiles[col_name]
         print(f"\nAnaliză pentru coloana {col_letter} ({col_name}):")
-        print(f"Tip de date: {df[col_name].dtype}")
-        print(f"Valori unice: {df[col_name].nunique()}")
-        print(f"Valori lipsă: {df[col_name].isnull().sum()}")
+        print(f"Tip de date: {profile['dtype']}")
+        print(f"Valori unice: {profile['nunique']}")
+        print(f"Valori lipsă: {profile['missing']}")
         
         # Identificăm duplicatele
-        duplicates = df[df.duplicated(subset=[col_name], keep=False)]
-        print(f"Număr de rânduri duplicate: {len(duplicates)}")
+        print(f"Număr de rânduri duplicate: {profile['duplicates']}")
         
-        if len(duplicates) > 0:
+        if profile['duplicates'] > 0:
             print("\nExemple de valori duplicate:")
-            print(duplicates[col_name].value_counts().head())
+            print(profile['top_values'][profile['top_values'] > 1])
         
         column_stats[col_letter] = {
-            'nunique': df[col_name].nunique(),
-            'missing': df[col_name].isnull().sum(),
-            'duplicates': len(duplicates)
+            'nunique': profile['nunique'],
+            'missing': profile['missing'],
+            'duplicates': profile['duplicates']
         }
     
     # Analiză similaritate între coloane
-    print("\nAnaliză similaritate între coloane:")
+    print(f"\nAnaliză similaritate între coloane (mod: {similarity_mode}):")
     similarity_matrix = {}
+    similarity_intervals = {}
+    non_null_values = {col_name: df[col_name].dropna().tolist() for col_name in columns_to_analyze.values()}
     
     for col1_letter, col1_name in columns_to_analyze.items():
         for col2_letter, col2_name in columns_to_analyze.items():
             if col1_letter < col2_letter:  # Evităm compararea aceleiași coloane
                 # Calculăm similaritatea folosind fuzzy matching
-                similarity = 0
-                count = 0
-                for val1, val2 in zip(df[col1_name].dropna(), df[col2_name].dropna()):
-                    similarity += fuzz.ratio(str(val1), str(val2))
-                    count += 1
-                if count > 0:
-                    similarity = similarity / count
+                with stage('column_similarity'):
+                    result = column_similarity(non_null_values[col1_name], non_null_values[col2_name],
+                                               mode=similarity_mode, sample_size=sample_size, workers=workers)
+                if result is not None:
+                    similarity, low, high, _ = result
                     similarity_matrix[f"{col1_letter}-{col2_letter}"] = similarity
-                    print(f"Similaritate între {col1_letter} și {col2_letter}: {similarity:.2f}%")
+                    similarity_intervals[f"{col1_letter}-{col2_letter}"] = (low, high)
+                    if similarity_mode == 'exact':
+                        print(f"Similaritate între {col1_letter} și {col2_letter}: {similarity:.2f}%")
+                    else:
+                        print(f"Similaritate între {col1_letter} și {col2_letter}: {similarity:.2f}% "
+                              f"(interval de încredere 95%: {low:.2f}% - {high:.2f}%)")
     
     # Salvăm rezultatele
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     print("\nSalvare rezultate...")
-    with pd.ExcelWriter(f'duplicate_analysis_{timestamp}.xlsx') as writer:
+    # Foile sunt scrise în flux (xlsxwriter, constant_memory), nu prin openpyxl
+    workbook = open_workbook(f'duplicate_analysis_{timestamp}.xlsx')
+    try:
         # Statistici generale
         stats_df = pd.DataFrame(column_stats).T
-        stats_df.to_excel(writer, sheet_name='Statistici Generale')
+        write_sheet(workbook, 'Statistici Generale', stats_df, index=True)
         
         # Similaritate între coloane
         similarity_df = pd.DataFrame(similarity_matrix.items(), columns=['Coloane', 'Similaritate'])
-        similarity_df.to_excel(writer, sheet_name='Similaritate Coloane', index=False)
+        similarity_df['Limita Inferioară'] = [similarity_intervals[pair][0] for pair in similarity_df['Coloane']]
+        similarity_df['Limita Superioară'] = [similarity_intervals[pair][1] for pair in similarity_df['Coloane']]
+        write_sheet(workbook, 'Similaritate Coloane', similarity_df)
         
-        # Salvăm duplicatele pentru fiecare coloană
-        for col_letter, col_name in columns_to_analyze.items():
-            duplicates = df[df.duplicated(subset=[col_name], keep=False)]
-            if len(duplicates) > 0:
-                duplicates.to_excel(writer, sheet_name=f'Duplicate_{col_letter}', index=False)
+        # Salvăm duplicatele pentru fiecare coloană doar dacă exportul complet este cerut:
+        # ca foi în același fișier Excel sau, pentru 'parquet' / 'csv', ca fișiere separate
+        if export_excel:
+            for col_letter, col_name in columns_to_analyze.items():
+                duplicates = df[profiles[col_name]['duplicate_mask']]
+                if len(duplicates) == 0:
+                    continue
+                if export_format == 'xlsx':
+                    write_sheet(workbook, f'Duplicate_{col_letter}', duplicates)
+                else:
+                    write_table(duplicates, f'duplicate_analysis_{timestamp}_Duplicate_{col_letter}', export_format)
+    finally:
+        with stage('excel_close'):
+            workbook.close()
     
     print(f"\nRezultatele au fost salvate în 'duplicate_analysis_{timestamp}.xlsx'")
     
@@ -111,6 +172,7 @@ def analyze_excel_duplicates():
     print("\nCreare vizualizări...")
     
     # 1. Grafic pentru numărul de valori unice și duplicate
+    plt = pyplot()
     plt.figure(figsize=(12, 6))
     x = list(column_stats.keys())
     unique_values = [stats['nunique'] for stats in column_stats.values()]
@@ -122,7 +184,8 @@ def analyze_excel_duplicates():
     plt.xlabel('Coloane')
     plt.ylabel('Număr de rânduri')
     plt.legend()
-    plt.savefig(f'duplicate_distribution_{timestamp}.png')
+    with stage('plot_distribution'):
+        plt.savefig(f'duplicate_distribution_{timestamp}.png')
     plt.close()
     
     # 2. Heatmap pentru similaritate
@@ -130,12 +193,14 @@ def analyze_excel_duplicates():
         similarity_data = np.zeros((len(columns_to_analyze), len(columns_to_analyze)))
         col_letters = list(columns_to_analyze.keys())
         
-        for (col1, col2), similarity in similarity_matrix.items():
+        for pair, similarity in similarity_matrix.items():
+            col1, col2 = pair.split('-')
             i = col_letters.index(col1)
             j = col_letters.index(col2)
             similarity_data[i, j] = similarity
             similarity_data[j, i] = similarity
         
+        sns = seaborn()
         plt.figure(figsize=(10, 8))
         sns.heatmap(similarity_data, 
                    xticklabels=col_letters,
@@ -144,7 +209,8 @@ def analyze_excel_duplicates():
                    fmt='.0f',
                    cmap='YlOrRd')
         plt.title('Similaritate între coloane (%)')
-        plt.savefig(f'similarity_heatmap_{timestamp}.png')
+        with stage('plot_heatmap'):
+            plt.savefig(f'similarity_heatmap_{timestamp}.png')
         plt.close()
     
     print(f"\nVizualizările au fost salvate în:")
@@ -152,4 +218,7 @@ def analyze_excel_duplicates():
     print(f"2. similarity_heatmap_{timestamp}.png")
 
 if __name__ == "__main__":
-    analyze_excel_duplicates()
+    if '--csv' in sys.argv:
+        analyze_excel_duplicates(export_excel=True, export_format='csv')
+    else:
+        analyze_excel_duplicates(export_excel='--excel' in sys.argv)
@@ -1,30 +1,29 @@
 import pandas as pd 
-import numpy as np
-import matplotlib.pyplot as plt
-import pyarrow.parquet as pq 
-from fuzzywuzzy import fuzz
-from collections import defaultdict
-import re
-
-def preprocess_text(text):
-    if pd.isna(text):
-        return ""
-    # Convertim în lowercase și eliminăm caracterele speciale
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    return text.strip()
+from Potrivire import ratio
+from Incarcare import DEFAULT_INPUT, load_table
+from Tipuri import optimize_dtypes
+from Instrumentare import pipeline, stage
 
 def calculate_similarity(str1, str2):
     if pd.isna(str1) or pd.isna(str2):
         return 0
-    return fuzz.ratio(str1, str2)
+    return ratio(str(str1), str(str2))
 
-def analyze_companies():
+@pipeline('analyze_companies')
+def analyze_companies(input_path=DEFAULT_INPUT, df=None):
     print("Începe analiza companiilor...")
     
-    # Citim datele
-    table = pq.read_table('Tensorflow.parquet')
-    df = table.to_pandas()
+    # Citim datele (citirea parquet și conversia în pandas sunt măsurate separat),
+    # doar dacă nu primim un DataFrame deja încărcat
+    if df is None:
+        with stage('read_parquet') as record:
+            table = load_table(input_path)
+            record['rows'] = table.num_rows
+        with stage('to_pandas', rows=table.num_rows):
+            df = table.to_pandas()
+    
+    # Convertim coloanele la tipuri compacte (categorii, numere, string[pyarrow])
+    df = optimize_dtypes(df)
     
     print(f"\nNumăr total de înregistrări: {len(df)}")
     
@@ -39,12 +38,12 @@ def analyze_companies():
     print("\nTipurile de date pentru fiecare coloană:")
     print(df.dtypes)
     
-    # Verificăm valorile lipsă
+    # Verificăm valorile lipsă (doar numărarea lor, fără profilul complet al coloanelor)
     print("\nValori lipsă în fiecare coloană:")
     print(df.isnull().sum())
     
     # Salvăm informațiile despre structura datelor într-un fișier text
-    with open('data_structure_info.txt', 'w', encoding='utf-8') as f:
+    with stage('write_report'), open('data_structure_info.txt', 'w', encoding='utf-8') as f:
         f.write("Structura setului de date:\n\n")
         f.write(f"Număr total de înregistrări: {len(df)}\n\n")
         f.write("Coloane disponibile:\n")
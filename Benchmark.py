@@ -0,0 +1,165 @@
+import pandas as pd
+import numpy as np
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from Sintetic import write_synthetic_parquet
+from Incarcare import load_dataset
+from Normalizare import normalize_series
+from Rezolvare import identify_unique_and_duplicates, select_columns_to_analyze
+from Blocking import similar_name_pairs
+from Profiler import profile_columns
+from Export import write_table
+from Instrumentare import PeakMemory
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+# Modulele de intrare ale etapelor și bibliotecile grele care nu ar trebui încărcate la importul lor
+ENTRY_MODULES = ['dataforge', 'Read', 'Covert', 'Analysis', 'Data_Procesing', 'Analiza', 'Rezolvare', 'Dask']
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'dask', 'rapidfuzz', 'fuzzywuzzy', 'xlsxwriter']
+
+def measure(results, size, stage, rows, func, *args, **kwargs):
+    """Rulează o etapă, îi adaugă timpul, debitul și memoria maximă în `results` și returnează rezultatul ei."""
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    results.append({
+        'size': size,
+        'stage': stage,
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(rows / seconds, 1) if seconds > 0 else None,
+        'peak_rss_mb': round(memory.peak_rss / (1024 * 1024), 1),
+        'rss_delta_mb': round((memory.peak_rss - memory.start_rss) / (1024 * 1024), 1)
+    })
+    print(f"{size:>11,} | {stage:<16} | {rows:>11,} rânduri | {seconds:9.3f} s | "
+          f"{results[-1]['peak_rss_mb']:9.1f} MB")
+    return value
+
+def measure_imports(modules=ENTRY_MODULES, repeat=3):
+    """
+    Timpul de import al fiecărui modul, într-un proces Python nou (fără module deja încărcate),
+    cel mai mic din `repeat` încercări, și bibliotecile grele (HEAVY_MODULES) încărcate de import.
+    Procesul rulează în directorul proiectului, deci modulele sunt găsite din orice director curent.
+    """
+    script = ("import sys, time; start = time.perf_counter(); import {module}; "
+              "seconds = time.perf_counter() - start; "
+              "print(seconds, ','.join(name for name in {heavy} if name in sys.modules))")
+    results = []
+    for module in modules:
+        timings, loaded = [], ''
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', script.format(module=module, heavy=HEAVY_MODULES)],
+                                    capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+            timings.append(float(output[0]))
+            loaded = output[1] if len(output) > 1 else ''
+        results.append({'module': module, 'seconds': round(min(timings), 4),
+                        'heavy_modules': loaded.split(',') if loaded else []})
+        print(f"{module:<16} | {min(timings):7.3f} s | {loaded or '-'}")
+    return results
+
+def dataset_path(data_dir, size, duplicate_rate, near_duplicate_rate, seed):
+    """Calea setului sintetic pentru parametrii dați (setul este refolosit între rulări)."""
+    return os.path.join(data_dir, f'synthetic_{size}_{duplicate_rate}_{near_duplicate_rate}_{seed}.parquet')
+
+def run_size(size, data_dir='benchmark_data', duplicate_rate=0.1, near_duplicate_rate=0.1, seed=0,
+             fuzzy_limit=100_000, export_formats=('parquet', 'csv'), workers=-1):
+    """
+    Rulează toate etapele pe setul sintetic de `size` rânduri și returnează măsurătorile.
+    Potrivirea fuzzy rulează pe primele `fuzzy_limit` rânduri (numărul lor apare în rezultate).
+    """
+    results = []
+    os.makedirs(data_dir, exist_ok=True)
+    path = dataset_path(data_dir, size, duplicate_rate, near_duplicate_rate, seed)
+    if not os.path.exists(path):
+        measure(results, size, 'generate', size, write_synthetic_parquet, path, size,
+                duplicate_rate=duplicate_rate, near_duplicate_rate=near_duplicate_rate, seed=seed)
+
+    # Citirea este măsurată fără cache-ul Arrow, ca să includă decodarea fișierului parquet
+    df = measure(results, size, 'load', size, load_dataset, path, use_cache=False)
+    measure(results, size, 'normalization', size, normalize_series, df['company_name'])
+
+    key_columns = list(select_columns_to_analyze(df.columns).values())
+    measure(results, size, 'exact_dedup', size, identify_unique_and_duplicates, df, key_columns)
+
+    names = df['company_name'].iloc[:fuzzy_limit].tolist()
+    measure(results, size, 'fuzzy_matching', len(names), similar_name_pairs, names, workers=workers)
+
+    measure(results, size, 'profiling', size, profile_columns, df, key_columns)
+
+    output_dir = os.path.join(data_dir, 'export')
+    os.makedirs(output_dir, exist_ok=True)
+    for export_format in export_formats:
+        exported = measure(results, size, f'export_{export_format}', size, write_table,
+                           df, os.path.join(output_dir, f'synthetic_{size}'), export_format)
+        os.remove(exported)
+    return results
+
+def run_benchmarks(sizes=None, output='benchmark_results.json', import_modules=ENTRY_MODULES, **options):
+    """
+    Rulează suita pentru fiecare mărime și adaugă rularea în fișierul JSON `output`
+    (o listă de rulări), ca rezultatele să poată fi comparate între versiuni.
+    Înainte sunt măsurați timpii de import ai modulelor `import_modules` (lista goală îi omite).
+    """
+    sizes = sizes or DEFAULT_SIZES
+    imports = []
+    if import_modules:
+        print(f"{'Modul':<16} | {'Import':>9} | Biblioteci grele încărcate")
+        imports = measure_imports(import_modules)
+        print()
+    print(f"{'Rânduri':>11} | {'Etapă':<16} | {'Procesate':>19} | {'Timp':>11} | {'RSS maxim':>12}")
+    results = []
+    for size in sizes:
+        results.extend(run_size(size, **options))
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'options': {key: list(value) if isinstance(value, tuple) else value for key, value in options.items()},
+        'imports': imports,
+        'results': results
+    }
+    runs = []
+    if os.path.exists(output):
+        with open(output, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append(run)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2, ensure_ascii=False)
+    print(f"\nRezultatele au fost adăugate în '{output}'")
+    return run
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pe seturi sintetice de companii.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Numărul de rânduri al seturilor generate")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="Proporția de duplicate exacte")
+    parser.add_argument('--near-duplicate-rate', type=float, default=0.1, help="Proporția de duplicate apropiate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fuzzy-limit', type=int, default=100_000,
+                        help="Numărul maxim de rânduri pentru potrivirea fuzzy")
+    parser.add_argument('--export-formats', nargs='+', default=['parquet', 'csv'],
+                        choices=['parquet', 'csv', 'xlsx'])
+    parser.add_argument('--workers', type=int, default=-1)
+    parser.add_argument('--data-dir', default='benchmark_data')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--import-modules', nargs='*', default=ENTRY_MODULES, metavar='MODUL',
+                        help="Modulele al căror timp de import este măsurat (fără valori: nu se măsoară)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_benchmarks(sizes=args.sizes, output=args.output, import_modules=args.import_modules, data_dir=args.data_dir,
+                   duplicate_rate=args.duplicate_rate, near_duplicate_rate=args.near_duplicate_rate,
+                   seed=args.seed, fuzzy_limit=args.fuzzy_limit,
+                   export_formats=tuple(args.export_formats), workers=args.workers)
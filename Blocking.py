@@ -0,0 +1,119 @@
+import pandas as pd
+from collections import defaultdict, Counter
+from Normalizare import normalize_series
+from Potrivire import score_index_pairs
+from Instrumentare import instrumented
+
+def name_qgrams(text, q=3):
+    """
+    Returnează mulțimea de q-grame (caractere) pentru un nume deja preprocesat.
+    Numele este bordat cu spații ca începutul și sfârșitul să aibă q-grame proprii.
+    """
+    text = ' '.join(text.split())
+    if not text:
+        return set()
+    padded = f" {text} "
+    if len(padded) <= q:
+        return {padded}
+    return {padded[i:i + q] for i in range(len(padded) - q + 1)}
+
+def rarest_qgrams(name_grams, frequency, prefix_size=8):
+    """Cele mai rare `prefix_size` q-grame ale unui nume, după frecvența lor (`frequency`) în set."""
+    return sorted(name_grams, key=lambda gram: (frequency[gram], gram))[:prefix_size]
+
+def build_blocking_index(normalized_names, q=3, prefix_size=8, prefixes=None, return_frequency=False):
+    """
+    Construiește indexul de blocare: cheie (q-gramă) -> lista de indici ai numelor.
+
+    Fiecare nume este indexat doar după cele mai rare `prefix_size` q-grame ale sale
+    (frecvența fiind calculată pe tot setul), astfel încât blocurile rămân mici,
+    iar două nume aproape identice împart aproape sigur cel puțin o cheie.
+    Cu `prefixes` (câte o valoare pe nume, de ex. orașul) cheia devine (prefix, q-gramă),
+    deci doar numele cu același prefix ajung în același bloc; numele fără prefix nu sunt
+    indexate. Cu `return_frequency=True` sunt returnate și frecvențele q-gramelor, pentru
+    căutarea altor nume în index.
+    """
+    grams = [name_qgrams(name, q) for name in normalized_names]
+    frequency = Counter(gram for name_grams in grams for gram in name_grams)
+
+    index = defaultdict(list)
+    for idx, name_grams in enumerate(grams):
+        if prefixes is not None and not prefixes[idx]:
+            continue
+        for gram in rarest_qgrams(name_grams, frequency, prefix_size):
+            index[gram if prefixes is None else (prefixes[idx], gram)].append(idx)
+    return (index, frequency) if return_frequency else index
+
+def generate_candidate_pairs(normalized_names, q=3, prefix_size=8, max_block_size=200, window=20):
+    """
+    Generează perechile candidate (i, j), i < j, din indexul de blocare.
+
+    Blocurile mici sunt comparate complet. Blocurile mai mari decât `max_block_size`
+    (q-grame foarte comune) sunt parcurse cu vecinătate sortată: fiecare nume este
+    comparat doar cu următoarele `window` nume în ordine alfabetică.
+    """
+    index = build_blocking_index(normalized_names, q=q, prefix_size=prefix_size)
+    pairs = set()
+
+    for members in index.values():
+        if len(members) < 2:
+            continue
+        if len(members) <= max_block_size:
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    pairs.add((members[a], members[b]))
+        else:
+            ordered = sorted(members, key=lambda idx: normalized_names[idx])
+            for a in range(len(ordered)):
+                for b in range(a + 1, min(a + 1 + window, len(ordered))):
+                    i, j = ordered[a], ordered[b]
+                    pairs.add((i, j) if i < j else (j, i))
+    return pairs
+
+@instrumented('fuzzy_matching', rows=lambda names, *args, **kwargs: len(names))
+def similar_name_pairs(names, threshold=85, q=3, prefix_size=8, max_block_size=200, window=20,
+                       compare_normalized=False, workers=-1, normalized_names=None):
+    """
+    Returnează perechile de indici (i, j, similaritate), i < j, ale numelor
+    cu similaritate peste `threshold`, comparând doar perechile candidate.
+    Cu `compare_normalized=True` similaritatea se calculează pe numele preprocesate.
+    `normalized_names` sunt numele deja preprocesate (de ex. din cache-ul Derivate.py),
+    în aceeași ordine, care nu mai sunt recalculate.
+    Scorurile sunt calculate în paralel pe `workers` fire (vezi Potrivire.py).
+    """
+    names = [str(name) for name in names]
+    if normalized_names is None:
+        normalized_names = normalize_series(pd.Series(names, dtype=object)).tolist()
+    else:
+        normalized_names = ['' if pd.isna(name) else str(name) for name in normalized_names]
+    pairs = generate_candidate_pairs(normalized_names, q=q, prefix_size=prefix_size,
+                                     max_block_size=max_block_size, window=window)
+
+    compared_names = normalized_names if compare_normalized else names
+    pairs = sorted(pairs)
+    scores = score_index_pairs(compared_names, pairs, workers=workers)
+    return [(i, j, int(similarity)) for (i, j), similarity in zip(pairs, scores) if similarity > threshold]
+
+def find_similar_names(names, threshold=85, q=3, prefix_size=8, max_block_size=200, window=20, workers=-1):
+    """
+    Caută nume de companii similare folosind indexul de blocare în locul
+    comparării fiecărei perechi de nume.
+
+    Returnează un dicționar nume -> listă de (nume_similar, similaritate),
+    pentru perechile cu similaritate peste `threshold`.
+    """
+    names = [str(name) for name in names]
+    return group_similar_names(names, similar_name_pairs(names, threshold=threshold, q=q, prefix_size=prefix_size,
+                                                         max_block_size=max_block_size, window=window,
+                                                         workers=workers))
+
+def group_similar_names(names, pairs):
+    """
+    Dicționarul nume -> listă de (nume_similar, similaritate) din perechile de indici
+    (i, j, similaritate) deja calculate (vezi similar_name_pairs).
+    """
+    names = [str(name) for name in names]
+    similar_companies = defaultdict(list)
+    for i, j, similarity in pairs:
+        similar_companies[names[i]].append((names[j], similarity))
+    return similar_companies
@@ -0,0 +1,159 @@
+import pandas as pd
+import numpy as np
+from Blocking import similar_name_pairs
+from Normalizare import KEY_SOURCES, canonical_keys, frequent_keys
+from Geografic import LATITUDE_COLUMN, LONGITUDE_COLUMN, parse_coordinates, geo_name_pairs
+from Instrumentare import instrumented
+
+# Coloanele principale de potrivire exactă; implicit gruparea folosește cheile canonice
+# din toate coloanele lor (Normalizare.KEY_SOURCES), inclusiv listele de domenii și telefoane
+EXACT_MATCH_COLUMNS = ['website_domain', 'primary_email', 'primary_phone']
+
+def find_root(parent, i):
+    """Găsește rădăcina lui `i`, scurtând drumul (path halving) pe parcurs."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def union_pairs(n, pairs):
+    """
+    Union-find pe un array de părinți: unește toate perechile (i, j) și
+    returnează pentru fiecare din cele `n` elemente rădăcina componentei sale.
+    Costul este liniar în numărul de perechi (practic, cu path halving și union by size).
+    """
+    parent = list(range(n))
+    size = [1] * n
+    for i, j in pairs:
+        root_i = find_root(parent, i)
+        root_j = find_root(parent, j)
+        if root_i == root_j:
+            continue
+        if size[root_i] < size[root_j]:
+            root_i, root_j = root_j, root_i
+        parent[root_j] = root_i
+        size[root_i] += size[root_j]
+    return np.array([find_root(parent, i) for i in range(n)], dtype=np.int64)
+
+def exact_match_pairs(values, max_group_size=None):
+    """
+    Perechile de poziții (i, j) ale rândurilor cu aceeași valoare nenulă.
+    Rândurile fiecărui grup sunt legate în lanț, deci un grup de k rânduri
+    produce doar k - 1 perechi. Valorile care apar de mai mult de `max_group_size`
+    ori (o valoare generică, nu a unei singure companii) nu leagă rânduri.
+    """
+    codes, _ = pd.factorize(values)
+    if max_group_size is not None and len(codes):
+        counts = np.bincount(codes[codes >= 0], minlength=codes.max() + 1)
+        codes = np.where((codes >= 0) & (counts[codes] > max_group_size), -1, codes)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    same = (sorted_codes[1:] == sorted_codes[:-1]) & (sorted_codes[1:] >= 0)
+    return zip(order[:-1][same].tolist(), order[1:][same].tolist())
+
+def shared_key_pairs(keys, max_group_size=None):
+    """
+    Perechile de rânduri (i, j) cu aceeași cheie canonică, din tabelul lung (row, key)
+    al Normalizare.canonical_keys. Ca în exact_match_pairs, rândurile cu aceeași cheie
+    sunt legate în lanț, iar cheile a mai mult de `max_group_size` rânduri sunt ignorate.
+    """
+    if max_group_size is not None:
+        keys = keys[~keys['key'].isin(frequent_keys(keys, max_group_size))]
+    order = np.lexsort((keys['row'].to_numpy(), keys['key'].to_numpy()))
+    sorted_keys = keys['key'].to_numpy()[order]
+    rows = keys['row'].to_numpy()[order]
+    same = (sorted_keys[1:] == sorted_keys[:-1]) & (rows[1:] != rows[:-1])
+    return zip(rows[:-1][same].tolist(), rows[1:][same].tolist())
+
+def shared_key_mask(keys, n):
+    """Masca celor `n` rânduri care au cel puțin o cheie canonică comună cu un alt rând."""
+    rows_per_key = keys.groupby('key')['row'].transform('nunique')
+    mask = np.zeros(n, dtype=bool)
+    mask[keys['row'].to_numpy()[(rows_per_key > 1).to_numpy()]] = True
+    return mask
+
+def fuzzy_name_pairs(names, threshold=85, workers=-1, name_pairs=None, normalized_names=None):
+    """
+    Perechile de poziții ale rândurilor cu nume identice sau similare (peste `threshold`,
+    comparând numele preprocesate). Numele identice sunt legate exact; doar numele
+    distincte trec prin potrivirea fuzzy. `name_pairs` sunt perechile (i, j, similaritate)
+    deja calculate pentru numele distincte (în ordinea din pd.factorize), care înlocuiesc
+    potrivirea fuzzy; `normalized_names` sunt numele deja preprocesate, pe pozițiile rândurilor.
+    """
+    codes, unique_names = pd.factorize(names)
+    pairs = list(exact_match_pairs(names))
+
+    # Primul rând pentru fiecare nume distinct reprezintă toate rândurile cu acel nume
+    present = codes >= 0
+    first_row = pd.Series(np.flatnonzero(present)).groupby(codes[present]).first().to_numpy()
+    if name_pairs is None:
+        unique_normalized = None if normalized_names is None else np.asarray(normalized_names, dtype=object)[first_row]
+        name_pairs = similar_name_pairs(unique_names, threshold=threshold, compare_normalized=True, workers=workers,
+                                        normalized_names=unique_normalized)
+    for i, j, _ in name_pairs:
+        pairs.append((int(first_row[i]), int(first_row[j])))
+    return pairs
+
+def geo_fuzzy_name_pairs(df, radius_km, name_column='company_name', threshold=85, workers=-1,
+                         normalized_names=None):
+    """
+    Perechile de poziții ale rândurilor cu nume similare aflate la cel mult `radius_km` km
+    (Geografic.geo_name_pairs). Rândurile fără coordonate sunt comparate doar între ele,
+    prin potrivirea fuzzy obișnuită (fuzzy_name_pairs).
+    """
+    if normalized_names is not None:
+        normalized_names = np.asarray(normalized_names, dtype=object)
+    pairs = [(i, j) for i, j, _ in geo_name_pairs(df, radius_km=radius_km, threshold=threshold,
+                                                   name_column=name_column, workers=workers,
+                                                   normalized_names=normalized_names)]
+    latitude, longitude = parse_coordinates(df)
+    missing = np.flatnonzero(np.isnan(latitude) | np.isnan(longitude))
+    missing_normalized = None if normalized_names is None else normalized_names[missing]
+    for i, j in fuzzy_name_pairs(df[name_column].iloc[missing], threshold=threshold, workers=workers,
+                                 normalized_names=missing_normalized):
+        pairs.append((int(missing[i]), int(missing[j])))
+    return pairs
+
+@instrumented('clustering', rows=lambda df, *args, **kwargs: len(df))
+def cluster_entities(df, exact_columns=None, name_column='company_name', name_threshold=85, workers=-1,
+                     key_kinds=None, geo_radius_km=None, max_group_size=50, name_pairs=None, keys=None,
+                     normalized_names=None):
+    """
+    Grupează rândurile care reprezintă aceeași entitate, combinând toate regulile:
+    potrivire exactă și potrivire fuzzy pe `name_column`. Implicit potrivirea exactă
+    folosește cheile canonice `key_kinds` (domeniu, email, telefon, din toate coloanele
+    lor, inclusiv listele, vezi Normalizare.canonical_keys); cu `exact_columns` date,
+    valorile acestor coloane sunt comparate direct. Cu `geo_radius_km`, numele sunt comparate
+    doar între companiile aflate la cel mult atâția km una de alta (vezi geo_fuzzy_name_pairs);
+    altfel `name_pairs` (perechile deja calculate ale numelor distincte, vezi fuzzy_name_pairs)
+    evită o nouă potrivire fuzzy. `keys` (tip -> tabelul (row, key)) și `normalized_names`
+    (pe pozițiile rândurilor) sunt cheile canonice și numele preprocesate deja calculate,
+    de exemplu din cache-ul Derivate.py.
+    Perechile din toate regulile sunt unite tranzitiv (union-find), astfel încât
+    A~B pe website și B~C pe nume pun A, B și C în același cluster. De aceea cheile și
+    valorile exacte comune mai multor de `max_group_size` rânduri (un email sau un telefon
+    generic) sunt ignorate: altfel ar uni în același cluster toate companiile care le au.
+
+    Returnează o serie cu ID-ul de cluster pentru fiecare rând (același index ca `df`).
+    """
+    pairs = []
+    if exact_columns is None:
+        for kind in key_kinds or KEY_SOURCES:
+            kind_keys = keys[kind] if keys is not None and kind in keys else canonical_keys(df, kind)
+            pairs.extend(shared_key_pairs(kind_keys, max_group_size=max_group_size))
+    else:
+        for col in exact_columns:
+            if col in df.columns:
+                pairs.extend(exact_match_pairs(df[col], max_group_size=max_group_size))
+    if name_column is not None and name_column in df.columns:
+        if geo_radius_km is not None and LATITUDE_COLUMN in df.columns and LONGITUDE_COLUMN in df.columns:
+            pairs.extend(geo_fuzzy_name_pairs(df, geo_radius_km, name_column=name_column,
+                                              threshold=name_threshold, workers=workers,
+                                              normalized_names=normalized_names))
+        else:
+            pairs.extend(fuzzy_name_pairs(df[name_column], threshold=name_threshold, workers=workers,
+                                          name_pairs=name_pairs, normalized_names=normalized_names))
+
+    roots = union_pairs(len(df), pairs)
+    cluster_ids, _ = pd.factorize(roots)
+    return pd.Series(cluster_ids, index=df.index, name='cluster_id')
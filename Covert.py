@@ -1,29 +1,44 @@
-import pandas as pd
 import pyarrow.parquet as pq
 import time
+import sys
+import os
+from Incarcare import DEFAULT_INPUT, DEFAULT_SECOND_INPUT, iter_batches, write_feather_cache
+from Export import write_batches
 
-def convert_parquet_to_excel():
-    print("Începe conversia fișierelor parquet în Excel...")
-    
-    # Citim fișierele parquet
-    print("Se citesc fișierele parquet...")
-    table1 = pq.read_table('Tensorflow.parquet')
-    table2 = pq.read_table('veridion_entity_resolution_challenge.snappy.parquet')
-    
-    # Convertim în DataFrame
-    data_set1 = table1.to_pandas()
-    data_set2 = table2.to_pandas()
-    
-    # Salvăm în Excel
-    print("Se salvează Tensorflow.parquet în Excel...")
-    data_set1.to_excel('Tensorflow.xlsx', index=False)
+def convert_parquet_to_feather(parquet_paths=(DEFAULT_INPUT, DEFAULT_SECOND_INPUT)):
+    print("Începe crearea cache-ului Arrow (Feather) pentru fișierele parquet...")
+    for parquet_path in parquet_paths:
+        print(f"Se citește {parquet_path}...")
+        # Cache-ul este scris pe loturi, fără să încărcăm tot fișierul în memorie
+        rows = write_feather_cache(parquet_path)
+        print(f"{parquet_path}: {rows} rânduri salvate în cache")
+
+def export_name(parquet_path):
+    """Numele fișierului exportat pentru un fișier parquet (fără extensie)."""
+    directory, name = os.path.split(parquet_path)
+    if name == DEFAULT_SECOND_INPUT:
+        return os.path.join(directory, 'entity_resolution_challenge')
+    return os.path.join(directory, name.split('.')[0])
+
+def convert_parquet_to_excel(export_format='xlsx', parquet_paths=(DEFAULT_INPUT, DEFAULT_SECOND_INPUT)):
+    print(f"Începe conversia fișierelor parquet în {export_format}...")
     
-    print("Se salvează veridion_entity_resolution_challenge.snappy.parquet în Excel...")
-    data_set2.to_excel('entity_resolution_challenge.xlsx', index=False)
+    # Fișierele sunt citite și scrise pe loturi, deci memoria nu depinde de mărimea lor;
+    # foile Excel care depășesc limita de rânduri sunt împărțite automat
+    for parquet_path in parquet_paths:
+        print(f"Se salvează {parquet_path} în {export_format}...")
+        path, rows = write_batches(iter_batches(parquet_path, to_pandas=False), export_name(parquet_path),
+                                   export_format=export_format, schema=pq.read_schema(parquet_path))
+        print(f"{path}: {rows} rânduri")
    
 
 if __name__ == "__main__":
     start_time = time.time()
-    convert_parquet_to_excel()
+    convert_parquet_to_feather()
+    # Exportul în Excel este opțional și nu mai este necesar pentru analize
+    if '--excel' in sys.argv:
+        convert_parquet_to_excel()
+    elif '--csv' in sys.argv:
+        convert_parquet_to_excel(export_format='csv')
     end_time = time.time()
     print(f"\nTimpul total de execuție: {end_time - start_time:.2f} secunde")
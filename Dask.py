@@ -1,17 +1,15 @@
 import pandas as pd 
 import numpy as np
-import dask.dataframe as dd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from dask.diagnostics import ProgressBar
+import pyarrow.parquet as pq
+from Incarcare import DEFAULT_INPUT, load_dask_dataset
+from Schite import sketch_partition, merge_sketches, sketch_summary, tree_reduce
+from Grafice import dask_histograms, save_histograms
+from Export import open_workbook, write_sheet
+from Instrumentare import pipeline, stage
 import os
 
-# Configurăm opțiunile de afișare pentru dask
-dd.set_options(display_max_rows=75)
-
-def debug_file_existence():
+def debug_file_existence(file_path=DEFAULT_INPUT):
     """Verifică dacă fișierul parquet există și afișează informații despre el."""
-    file_path = 'Tensorflow.parquet'
     if os.path.exists(file_path):
         print(f"\nFișierul {file_path} există!")
         print(f"Dimensiune: {os.path.getsize(file_path) / (1024*1024):.2f} MB")
@@ -22,19 +20,49 @@ def debug_file_existence():
         print("\n".join(os.listdir(".")))
         raise FileNotFoundError(f"Fișierul {file_path} nu a fost găsit!")
 
-def analyze_large_dataset():
+def count_rows(file_path, df, filters=None):
+    """
+    Numără rândurile din metadatele parquet, fără să citească datele.
+    Dacă metadatele nu sunt disponibile sau datele sunt filtrate,
+    se adună lungimile partițiilor.
+    """
+    if not filters:
+        try:
+            return pq.read_metadata(file_path).num_rows
+        except Exception:
+            pass
+    return int(df.map_partitions(len).sum().compute())
+
+def approximate_profile(df, precision=14, capacity=100):
+    """
+    Construiește (fără să calculeze) graful pentru profilul aproximativ:
+    câte o schiță HyperLogLog + SpaceSaving pe partiție, combinate apoi în arbore.
+    Memoria folosită nu depinde de numărul de rânduri, iar datele nu sunt amestecate (shuffle).
+    """
+    import dask
+    columns = list(df.columns)
+    sketches = [dask.delayed(sketch_partition)(part, columns, precision, capacity)
+                for part in df.to_delayed()]
+    return tree_reduce(sketches, merge_sketches, capacity)
+
+@pipeline('analyze_large_dataset')
+def analyze_large_dataset(columns=None, filters=None, approximate=False, top_k=10, precision=14,
+                          input_path=DEFAULT_INPUT, bins=50):
+    # Dask este importat doar aici, la rularea analizei, nu la importul modulului
+    import dask
+    from dask.diagnostics import ProgressBar
     try:
         print("Începe analiza setului mare de date folosind Dask...")
         
         # Verificăm existența fișierului
-        debug_file_existence()
+        debug_file_existence(input_path)
         
         # Setăm opțiuni pentru pandas (nu pentru dask)
         pd.set_option('display.max_rows', 75)
         
         print("\nCitire fișier parquet...")
         try:
-            df = dd.read_parquet('Tensorflow.parquet')
+            df = load_dask_dataset(input_path, columns=columns, filters=filters)
             print("Fișierul parquet a fost citit cu succes!")
         except Exception as e:
             print(f"Eroare la citirea fișierului parquet: {str(e)}")
@@ -55,20 +83,44 @@ def analyze_large_dataset():
             with ProgressBar():
                 # Verificăm dacă dataframe-ul nu este gol
                 if df.npartitions > 0:
-                    # Număr total de rânduri
-                    total_rows = len(df.compute())
+                    # Număr total de rânduri, din metadatele parquet
+                    with stage('count_rows'):
+                        total_rows = count_rows(input_path, df, filters)
                     print(f"\nNumăr total de rânduri: {total_rows:,}")
                     print(f"Număr de partiții: {df.npartitions}")
                     
+                    # Calculăm toate statisticile într-o singură parcurgere a datelor
+                    if approximate:
+                        # Pe fișiere mari evităm nunique / value_counts exacte (care necesită shuffle):
+                        # descriem doar coloanele numerice, iar restul este profilat cu schițe
+                        numeric_columns = list(df.select_dtypes(include='number').columns)
+                        graphs = [df.isnull().sum(), df.count()]
+                        if numeric_columns:
+                            graphs.append(df[numeric_columns].describe())
+                        # Colecțiile dask sunt trecute ca obiecte delayed: calculate împreună cu
+                        # schițele (delayed), ar fi întoarse în altă ordine decât cea cerută
+                        graphs = [graph.to_delayed()[0] for graph in graphs]
+                        graphs.append(approximate_profile(df, precision=precision, capacity=top_k * 10))
+                        with stage('compute_statistics', rows=total_rows):
+                            results = dask.compute(*graphs)
+                        missing_values, non_null_counts, sketches = results[0], results[1], results[-1]
+                        numeric_stats = results[2] if numeric_columns else pd.DataFrame()
+                        approximate_stats = sketch_summary(sketches, non_null_counts, top_k=top_k)
+                    else:
+                        with stage('compute_statistics', rows=total_rows):
+                            numeric_stats, missing_values = dask.compute(df.describe(), df.isnull().sum())
+                    
                     # Statistici pentru coloanele numerice
                     print("\nStatistici pentru coloanele numerice:")
-                    numeric_stats = df.describe().compute()
                     print(numeric_stats)
                     
                     # Verificăm valorile lipsă
                     print("\nValori lipsă în fiecare coloană:")
-                    missing_values = df.isnull().sum().compute()
                     print(missing_values[missing_values > 0])
+                    
+                    if approximate:
+                        print("\nProfil aproximativ (HyperLogLog / SpaceSaving):")
+                        print(approximate_stats[['Coloană', 'Valori Distincte (aprox.)', 'Rânduri Duplicate (aprox.)']])
                 else:
                     print("AVERTISMENT: DataFrame-ul este gol!")
         except Exception as e:
@@ -78,9 +130,15 @@ def analyze_large_dataset():
         # Salvăm statisticile într-un fișier Excel
         print("\nSalvare statistici în Excel...")
         try:
-            with pd.ExcelWriter('dask_analysis_results.xlsx') as writer:
-                numeric_stats.to_excel(writer, sheet_name='Statistici Numerice')
-                missing_values.to_frame('Valori Lipsă').to_excel(writer, sheet_name='Valori Lipsă')
+            workbook = open_workbook('dask_analysis_results.xlsx')
+            try:
+                write_sheet(workbook, 'Statistici Numerice', numeric_stats, index=True)
+                write_sheet(workbook, 'Valori Lipsă', missing_values.to_frame('Valori Lipsă'), index=True)
+                if approximate:
+                    write_sheet(workbook, 'Profil Aproximativ', approximate_stats)
+            finally:
+                with stage('excel_close'):
+                    workbook.close()
         except Exception as e:
             print(f"Eroare la salvarea în Excel: {str(e)}")
             print("Continuăm cu restul analizei...")
@@ -88,25 +146,20 @@ def analyze_large_dataset():
         # Creăm vizualizări pentru distribuția datelor
         print("\nCreare vizualizări...")
         try:
-            # Selectăm primele 100,000 de rânduri pentru vizualizare
-            sample_df = df.head(n=33447, compute=True)
-            
-            # Creăm mai multe subploturi pentru coloanele numerice
-            numeric_cols = sample_df.select_dtypes(include=[np.number]).columns
-            n_cols = len(numeric_cols)
+            # Histogramele folosesc tot setul de date: intervalele sunt numărate pe partiții,
+            # iar la matplotlib ajung doar numerele pe intervale (memorie constantă)
+            numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
             
-            if n_cols > 0:
-                fig, axes = plt.subplots(n_cols, 1, figsize=(12, 5*n_cols))
-                if n_cols == 1:
-                    axes = [axes]
-                
-                for i, col in enumerate(numeric_cols):
-                    sns.histplot(data=sample_df, x=col, ax=axes[i])
-                    axes[i].set_title(f'Distribuția pentru {col}')
-                
-                plt.tight_layout()
-                plt.savefig('distributions.png')
-                plt.close()
+            if numeric_cols:
+                # Minimele și maximele sunt deja în statisticile numerice (describe)
+                ranges = {col: (numeric_stats.at['min', col], numeric_stats.at['max', col])
+                          for col in numeric_cols
+                          if col in numeric_stats.columns and {'min', 'max'} <= set(numeric_stats.index)}
+                with stage('compute_histograms', rows=total_rows):
+                    histograms = dask_histograms(df, numeric_cols, bins=bins, ranges=ranges)
+                if histograms:
+                    with stage('plot_distributions'):
+                        save_histograms(histograms, 'distributions.png')
         except Exception as e:
             print(f"Eroare la crearea vizualizărilor: {str(e)}")
             print("Continuăm cu finalizarea analizei...")
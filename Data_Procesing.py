@@ -1,32 +1,23 @@
 import pandas as pd
-import numpy as np
-import pyarrow.parquet as pq
-import matplotlib.pyplot as plt
-import seaborn as sns
-import dask.dataframe as dd
-from fuzzywuzzy import fuzz
-from collections import defaultdict
-import re
+from Normalizare import KEY_SOURCES
 from datetime import datetime
+from Blocking import similar_name_pairs, group_similar_names
+from Incarcare import DEFAULT_INPUT, DEFAULT_SECOND_INPUT, load_table, load_dataset, available_columns
+from Tipuri import optimize_dtypes
+from Profiler import profile_columns
+from Clustering import cluster_entities, shared_key_mask
+from MinHash import TEXT_COLUMNS, text_duplicate_pairs, pair_report
+from Export import open_workbook, write_sheet
+from Instrumentare import pipeline, stage
+from Derivate import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB, derive_columns, derived_keys, keys_column, load_derived
+import os
 
-def preprocess_text(text):
-    if pd.isna(text):
-        return ""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    return text.strip()
-
-def analyze_company_data():
+@pipeline('analyze_company_data')
+def analyze_company_data(similarity_threshold=85, filters=None, workers=-1, load_second_dataset=False,
+                         input_path=DEFAULT_INPUT, second_path=DEFAULT_SECOND_INPUT, geo_radius_km=None, df=None,
+                         use_cache=True, cache_dir=DEFAULT_CACHE_DIR, max_cache_mb=DEFAULT_CACHE_SIZE_MB):
     print("Începe analiza detaliată a datelor companiilor...")
     
-    # Citim datele
-    print("\nCitire fișiere parquet...")
-    table1 = pq.read_table('Tensorflow.parquet')
-    table2 = pq.read_table('veridion_entity_resolution_challenge.snappy.parquet')
-    
-    data_set1 = table1.to_pandas()
-    data_set2 = table2.to_pandas()
-    
     # Lista de câmpuri pentru analiză
     fields_to_analyze = [
         'website_url', 'primary_email', 'primary_phone', 'domains',
@@ -37,6 +28,47 @@ def analyze_company_data():
         'main_sector', 'sic_codes', 'naics_2022_primary_code'
     ]
     
+    # Citim datele: doar câmpurile analizate, iar filtrele (opționale) sunt aplicate la citire
+    print("\nCitire fișiere parquet...")
+    # Pe lângă câmpurile analizate citim toate coloanele cheilor canonice (domeniu, email,
+    # telefon, inclusiv listele) și câmpurile text comparate cu MinHash
+    extra_columns = [col for columns in KEY_SOURCES.values() for col in columns] + TEXT_COLUMNS
+    columns1 = fields_to_analyze + [col for col in dict.fromkeys(extra_columns) if col not in fields_to_analyze]
+    # Un DataFrame deja încărcat (`df`) este folosit direct, fără o nouă citire
+    if df is not None:
+        data_set1 = df[[col for col in columns1 if col in df.columns]].copy()
+    else:
+        with stage('read_parquet') as record:
+            table1 = load_table(input_path,
+                                columns=available_columns(input_path, columns1),
+                                filters=filters)
+            record['rows'] = table1.num_rows
+        with stage('to_pandas', rows=table1.num_rows):
+            data_set1 = table1.to_pandas()
+    # Al doilea set este folosit doar pentru verificarea câmpurilor, deci fișierul lui
+    # este deschis numai la cerere (și doar dacă există)
+    available_fields2 = None
+    data_set2 = None
+    if load_second_dataset and not os.path.exists(second_path):
+        print(f"Fișierul {second_path} nu există; al doilea set nu este încărcat")
+    elif load_second_dataset:
+        available_fields2 = available_columns(second_path, fields_to_analyze)
+        with stage('read_second_dataset') as record:
+            data_set2 = load_dataset(second_path, columns=available_fields2)
+            record['rows'] = len(data_set2)
+    
+    # Numele preprocesate și cheile canonice (Derivate.py) vin din cache-ul fișierului; cu filtre
+    # rândurile nu mai corespund fișierului, deci coloanele derivate sunt calculate direct
+    derived = None
+    if use_cache and not filters:
+        derived = load_derived(input_path, cache_dir=cache_dir, max_size_mb=max_cache_mb)
+    if derived is None or len(derived) != len(data_set1):
+        with stage('derive_columns', rows=len(data_set1)):
+            derived = derive_columns(data_set1.reset_index(drop=True))
+    
+    # Convertim câmpurile la tipuri compacte înainte de statistici și deduplicare
+    data_set1 = optimize_dtypes(data_set1)
+    
     # Verificăm existența câmpurilor în seturile de date
     print("\nVerificare câmpuri disponibile în seturile de date:")
     print("\nSet 1 (Tensorflow):")
@@ -44,23 +76,24 @@ def analyze_company_data():
     print(f"Câmpuri disponibile: {len(available_fields1)}")
     print(available_fields1)
     
-    print("\nSet 2 (Veridion):")
-    available_fields2 = [field for field in fields_to_analyze if field in data_set2.columns]
-    print(f"Câmpuri disponibile: {len(available_fields2)}")
-    print(available_fields2)
+    if available_fields2 is not None:
+        print("\nSet 2 (Veridion):")
+        print(f"Câmpuri disponibile: {len(available_fields2)}")
+        print(available_fields2)
     
     # Analiză statistică pentru fiecare câmp
     print("\nAnaliză statistică pentru fiecare câmp:")
-    stats = {}
+    # Profilăm câmpurile o singură dată; statisticile și duplicatele de mai jos refolosesc profilul
+    stats = profile_columns(data_set1, available_fields1)
     
     for field in available_fields1:
         if field in data_set1.columns:
             print(f"\nAnaliză pentru {field}:")
-            print(f"Tip de date: {data_set1[field].dtype}")
-            print(f"Valori unice: {data_set1[field].nunique()}")
-            print(f"Valori lipsă: {data_set1[field].isnull().sum()}")
+            print(f"Tip de date: {stats[field]['dtype']}")
+            print(f"Valori unice: {stats[field]['nunique']}")
+            print(f"Valori lipsă: {stats[field]['missing']}")
             
-            if data_set1[field].dtype in ['int64', 'float64']:
+            if pd.api.types.is_numeric_dtype(data_set1[field]):
                 print(f"Statistici numerice:")
                 print(data_set1[field].describe())
             else:
@@ -70,27 +103,35 @@ def analyze_company_data():
     # Identificăm potențiale duplicate bazate pe diferite criterii
     print("\nIdentificare potențiale duplicate:")
     
-    # 1. După website_url
-    if 'website_url' in data_set1.columns:
-        website_duplicates = data_set1[data_set1.duplicated(subset=['website_url'], keep=False)]
-        print(f"\nNumăr de companii cu website-uri duplicate: {len(website_duplicates)}")
-    
-    # 2. După email
-    if 'primary_email' in data_set1.columns:
-        email_duplicates = data_set1[data_set1.duplicated(subset=['primary_email'], keep=False)]
-        print(f"Număr de companii cu email-uri duplicate: {len(email_duplicates)}")
+    # 1-3. După domeniu, email și telefon: valorile canonice din toate coloanele fiecărui tip
+    # (inclusiv listele), comparate ca hash-uri, deci "https://www.acme.com/" și "acme.com"
+    # sunt același website, iar "+40 721 123 456" și "0040721123456" același telefon;
+    # tabelele de chei sunt refolosite la gruparea entităților (pasul 6)
+    key_labels = {'domain': 'website-uri', 'email': 'email-uri', 'phone': 'telefoane'}
+    key_duplicates = {}
+    keys = {}
+    for kind, label in key_labels.items():
+        if keys_column(kind) in derived.columns:
+            with stage(f'{kind}_keys', rows=len(data_set1)):
+                keys[kind] = derived_keys(derived, kind)
+            key_duplicates[kind] = data_set1[shared_key_mask(keys[kind], len(data_set1))]
+            print(f"Număr de companii cu {label} duplicate: {len(key_duplicates[kind])}")
     
-    # 3. După nume companie (folosind fuzzy matching)
+    # 4. După nume companie (folosind fuzzy matching)
+    name_pairs = None
     if 'company_name' in data_set1.columns:
         print("\nAnaliză similaritate nume companii...")
-        company_names = data_set1['company_name'].dropna().unique()
-        similar_companies = defaultdict(list)
-        
-        for i, name1 in enumerate(company_names[:100]):  # Limităm la primele 100 pentru performanță
-            for name2 in company_names[i+1:]:
-                similarity = fuzz.ratio(str(name1), str(name2))
-                if similarity > 85:  # Prag de similaritate
-                    similar_companies[name1].append((name2, similarity))
+        codes, company_names = pd.factorize(data_set1['company_name'])
+        # Numele preprocesate din coloanele derivate, luate de la primul rând al fiecărui nume distinct
+        present = codes >= 0
+        first_row = pd.Series(present.nonzero()[0]).groupby(codes[present]).first().to_numpy()
+        normalized_names = derived['name_normalized'].to_numpy(dtype=object)[first_row]
+        # Comparăm doar perechile candidate generate de indexul de blocare; aceleași perechi
+        # sunt folosite și la gruparea entităților (pasul 6), deci potrivirea fuzzy rulează o dată
+        with stage('similar_names', rows=len(company_names)):
+            name_pairs = similar_name_pairs(company_names, threshold=similarity_threshold, compare_normalized=True,
+                                            workers=workers, normalized_names=normalized_names)
+            similar_companies = group_similar_names(company_names, name_pairs)
         
         print(f"Număr de companii cu nume similare: {len(similar_companies)}")
         if similar_companies:
@@ -100,26 +141,51 @@ def analyze_company_data():
                 for similar_name, similarity in similar:
                     print(f"- {similar_name} (similaritate: {similarity}%)")
     
+    # 5. După descrieri, etichete și nume comerciale (MinHash/LSH, fără comparații perechi cu perechi)
+    text_columns = [col for col in TEXT_COLUMNS if col in data_set1.columns]
+    text_duplicates = None
+    if text_columns:
+        print("\nAnaliză similaritate text (descrieri, etichete, nume comerciale)...")
+        text_duplicates = pair_report(data_set1, text_duplicate_pairs(data_set1, text_columns))
+        print(f"Număr de perechi de companii cu text similar: {len(text_duplicates)}")
+    
+    # 6. Grupăm tranzitiv duplicatele găsite de toate regulile (website, email, telefon, nume);
+    # cu `geo_radius_km` numele sunt comparate doar între companiile apropiate geografic
+    print("\nGrupare entități duplicate...")
+    data_set1['cluster_id'] = cluster_entities(data_set1, name_threshold=similarity_threshold, workers=workers,
+                                               geo_radius_km=geo_radius_km, name_pairs=name_pairs, keys=keys,
+                                               normalized_names=derived.get('name_normalized'))
+    cluster_sizes = data_set1['cluster_id'].map(data_set1['cluster_id'].value_counts())
+    clustered_companies = data_set1[cluster_sizes > 1].sort_values('cluster_id')
+    print(f"Număr de entități distincte (clustere): {data_set1['cluster_id'].nunique()}")
+    print(f"Număr de companii în clustere cu duplicate: {len(clustered_companies)}")
+    
     # Salvăm rezultatele
     print("\nSalvare rezultate...")
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Salvăm statistici în Excel
-    with pd.ExcelWriter(f'company_analysis_{timestamp}.xlsx') as writer:
+    # Salvăm statistici în Excel, în flux (xlsxwriter); foile prea mari sunt împărțite
+    workbook = open_workbook(f'company_analysis_{timestamp}.xlsx')
+    try:
         # Statistici generale
         stats_df = pd.DataFrame({
             'Câmp': available_fields1,
-            'Tip Date': [data_set1[field].dtype for field in available_fields1],
-            'Valori Unice': [data_set1[field].nunique() for field in available_fields1],
-            'Valori Lipsă': [data_set1[field].isnull().sum() for field in available_fields1]
+            'Tip Date': [stats[field]['dtype'] for field in available_fields1],
+            'Valori Unice': [stats[field]['nunique'] for field in available_fields1],
+            'Valori Lipsă': [stats[field]['missing'] for field in available_fields1]
         })
-        stats_df.to_excel(writer, sheet_name='Statistici Generale', index=False)
+        write_sheet(workbook, 'Statistici Generale', stats_df)
         
         # Exemple de duplicate
-        if 'website_url' in data_set1.columns:
-            website_duplicates.to_excel(writer, sheet_name='Website Duplicate', index=False)
-        if 'primary_email' in data_set1.columns:
-            email_duplicates.to_excel(writer, sheet_name='Email Duplicate', index=False)
+        key_sheets = {'domain': 'Website Duplicate', 'email': 'Email Duplicate', 'phone': 'Telefon Duplicate'}
+        for kind, duplicates in key_duplicates.items():
+            write_sheet(workbook, key_sheets[kind], duplicates)
+        write_sheet(workbook, 'Clustere Duplicate', clustered_companies)
+        if text_duplicates is not None:
+            write_sheet(workbook, 'Text Duplicate', text_duplicates)
+    finally:
+        with stage('excel_close'):
+            workbook.close()
     
     print(f"\nRezultatele au fost salvate în 'company_analysis_{timestamp}.xlsx'")
     
@@ -0,0 +1,218 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import hashlib
+import json
+import os
+from Normalizare import KEY_SOURCES, normalize_series, normalize_key, canonical_keys
+from Incarcare import available_columns, iter_batches
+from Instrumentare import stage
+
+# Versiunea normalizării: se mărește la orice schimbare a coloanelor derivate de mai jos,
+# ca intrările vechi din cache să nu mai fie folosite
+DERIVED_VERSION = 5
+DEFAULT_CACHE_DIR = 'derived_cache'
+DEFAULT_CACHE_SIZE_MB = 2048
+
+# Coloanele derivate: numele normalizate (blocarea pe oraș folosește `city_normalized`),
+# cheile exacte ca hash pe 64 de biți și, pentru fiecare tip de cheie canonică (domeniu,
+# email, telefon), lista hash-urilor din toate coloanele lui (Normalizare.KEY_SOURCES,
+# inclusiv listele); `company_name` este păstrat pentru rapoarte
+NAME_COLUMN = 'company_name'
+CITY_COLUMN = 'main_city'
+KEY_COLUMNS = ['website_domain', 'primary_email', 'primary_phone']
+SOURCE_COLUMNS = list(dict.fromkeys([NAME_COLUMN, CITY_COLUMN] + KEY_COLUMNS +
+                                    [col for columns in KEY_SOURCES.values() for col in columns]))
+
+def key_column(column):
+    """Numele coloanei derivate cu hash-ul cheii exacte `column`."""
+    return f'{column}_key'
+
+def keys_column(kind):
+    """Numele coloanei derivate cu lista hash-urilor cheilor canonice de tipul `kind`."""
+    return f'{kind}_keys'
+
+def hash_keys(series, column):
+    """
+    Hash-ul pe 64 de biți al cheii normalizate (Normalizare.normalize_key), ca `UInt64`;
+    valorile lipsă sau goale după normalizare rămân lipsă.
+    """
+    values = normalize_key(series, column)
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return pd.Series(pd.arrays.IntegerArray(hashes, (values == '').to_numpy()), index=series.index,
+                     name=key_column(column))
+
+def key_lists(df, kind):
+    """
+    Hash-urile cheilor canonice de tipul `kind` ale fiecărui rând (Normalizare.canonical_keys),
+    ca listă Arrow de uint64 per rând; rândurile fără chei au lista goală.
+    """
+    keys = canonical_keys(df, kind).sort_values('row', kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(keys['row'].to_numpy(), minlength=len(df)))])
+    array = pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), pa.array(keys['key'].to_numpy(), pa.uint64()))
+    return pd.Series(pd.arrays.ArrowExtensionArray(array), index=df.index, name=keys_column(kind))
+
+def derived_keys(derived, kind):
+    """
+    Tabelul lung (row, key) al cheilor canonice de tipul `kind` din coloanele derivate,
+    în forma Normalizare.canonical_keys, fără să recalculeze valorile canonice.
+    """
+    array = pa.array(derived[keys_column(kind)])
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    return pd.DataFrame({'row': pc.list_parent_indices(array).to_numpy().astype(np.int64),
+                         'key': pc.list_flatten(array).to_numpy()})
+
+def derive_columns(df):
+    """Calculează coloanele derivate pentru coloanele sursă prezente în `df` (același index)."""
+    derived = pd.DataFrame(index=df.index)
+    if NAME_COLUMN in df.columns:
+        derived[NAME_COLUMN] = df[NAME_COLUMN].astype('string[pyarrow]')
+        derived['name_normalized'] = normalize_series(df[NAME_COLUMN])
+    if CITY_COLUMN in df.columns:
+        derived['city_normalized'] = normalize_series(df[CITY_COLUMN])
+    for col in KEY_COLUMNS:
+        if col in df.columns:
+            derived[key_column(col)] = hash_keys(df[col], col)
+    for kind, columns in KEY_SOURCES.items():
+        if any(col in df.columns for col in columns):
+            derived[keys_column(kind)] = key_lists(df, kind)
+    return derived
+
+def derived_schema(source_columns):
+    """Schema Arrow a fișierului din cache pentru coloanele sursă date."""
+    fields = []
+    if NAME_COLUMN in source_columns:
+        fields += [pa.field(NAME_COLUMN, pa.large_string()), pa.field('name_normalized', pa.large_string())]
+    if CITY_COLUMN in source_columns:
+        fields.append(pa.field('city_normalized', pa.large_string()))
+    fields += [pa.field(key_column(col), pa.uint64()) for col in KEY_COLUMNS if col in source_columns]
+    fields += [pa.field(keys_column(kind), pa.list_(pa.uint64())) for kind, columns in KEY_SOURCES.items()
+               if any(col in source_columns for col in columns)]
+    return pa.schema(fields)
+
+def file_digest(path, cache_dir=DEFAULT_CACHE_DIR, chunk_size=8 * 1024 * 1024):
+    """
+    Hash-ul BLAKE2b al conținutului fișierului. Rezultatul este memorat în `cache_dir`
+    (după cale, mărime și data modificării), ca un fișier neschimbat să nu fie citit din nou.
+    """
+    digests_path = os.path.join(cache_dir, 'digests.json')
+    digests = {}
+    if os.path.exists(digests_path):
+        with open(digests_path, encoding='utf-8') as f:
+            digests = json.load(f)
+    info = os.stat(path)
+    entry = f'{os.path.abspath(path)}|{info.st_size}|{info.st_mtime_ns}'
+    if entry in digests:
+        return digests[entry]
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    # Hash-urile versiunilor anterioare ale aceluiași fișier nu mai sunt necesare
+    digests = {key: value for key, value in digests.items() if not key.startswith(f'{os.path.abspath(path)}|')}
+    digests[entry] = digest.hexdigest()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(digests_path, 'w', encoding='utf-8') as f:
+        json.dump(digests, f, indent=2)
+    return digests[entry]
+
+def evict_cache(cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_CACHE_SIZE_MB, keep=None):
+    """
+    Șterge intrările folosite cel mai demult (LRU, după data ultimei folosiri) până când
+    cache-ul are cel mult `max_size_mb` MB. Intrarea `keep` nu este ștearsă niciodată.
+    Returnează numărul de intrări șterse.
+    """
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.parquet')]
+    entries.sort(key=os.path.getmtime)
+    total = sum(os.path.getsize(path) for path in entries)
+    removed = 0
+    for path in entries:
+        if total <= max_size_mb * 1024 * 1024:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        total -= os.path.getsize(path)
+        os.remove(path)
+        removed += 1
+    return removed
+
+def derived_path(parquet_path, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_CACHE_SIZE_MB, batch_size=65536):
+    """
+    Calea fișierului parquet cu coloanele derivate ale fișierului `parquet_path` (un rând
+    pentru fiecare rând din fișier, în aceeași ordine). Cheia intrării este hash-ul
+    conținutului fișierului, versiunea normalizării și coloanele sursă, deci un fișier
+    neschimbat refolosește intrarea, iar unul modificat primește una nouă.
+    La lipsă, coloanele sunt calculate pe loturi și scrise în cache, apoi intrările vechi
+    sunt șterse (LRU) până când cache-ul încape în `max_size_mb` MB.
+    """
+    source_columns = available_columns(parquet_path, SOURCE_COLUMNS)
+    key = hashlib.blake2b(json.dumps([file_digest(parquet_path, cache_dir), DERIVED_VERSION, source_columns])
+                          .encode('utf-8'), digest_size=20).hexdigest()
+    path = os.path.join(cache_dir, f'{key}.parquet')
+    if os.path.exists(path):
+        # Data modificării ține loc de data ultimei folosiri pentru evacuarea LRU
+        os.utime(path)
+        return path
+
+    with stage('derive_columns') as record:
+        schema = derived_schema(source_columns)
+        partial_path = f'{path}.partial'
+        rows = 0
+        with pq.ParquetWriter(partial_path, schema) as writer:
+            for batch in iter_batches(parquet_path, columns=source_columns, batch_size=batch_size):
+                writer.write_table(pa.Table.from_pandas(derive_columns(batch), schema=schema, preserve_index=False))
+                rows += len(batch)
+        os.replace(partial_path, path)
+        record['rows'] = rows
+    evict_cache(cache_dir, max_size_mb, keep=path)
+    return path
+
+def derived_dtype(arrow_type):
+    """Tipul pandas al unei coloane din cache: hash-urile `UInt64`, listele de hash-uri rămân Arrow."""
+    if arrow_type == pa.uint64():
+        return pd.UInt64Dtype()
+    if pa.types.is_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+def to_derived_frame(table):
+    """Tabelul Arrow din cache ca DataFrame (tipurile coloanelor din derived_dtype)."""
+    return table.to_pandas(types_mapper=derived_dtype)
+
+def iter_derived(parquet_path, use_cache=True, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_CACHE_SIZE_MB,
+                 batch_size=65536):
+    """
+    Coloanele derivate ale fișierului pe loturi de cel mult `batch_size` rânduri, din cache
+    (creat la prima folosire) sau, cu `use_cache=False`, calculate direct din fișier.
+    """
+    if not use_cache:
+        for batch in iter_batches(parquet_path, columns=available_columns(parquet_path, SOURCE_COLUMNS),
+                                  batch_size=batch_size):
+            yield derive_columns(batch)
+        return
+    path = derived_path(parquet_path, cache_dir=cache_dir, max_size_mb=max_size_mb, batch_size=batch_size)
+    for table in iter_batches(path, batch_size=batch_size, to_pandas=False):
+        yield to_derived_frame(table)
+
+def load_derived(parquet_path, use_cache=True, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_CACHE_SIZE_MB,
+                 batch_size=65536, columns=None):
+    """
+    Coloanele derivate ale fișierului ca DataFrame, din cache dacă există
+    (sau calculate direct, fără cache, cu `use_cache=False`). `columns` limitează
+    coloanele derivate citite din cache.
+    """
+    if not use_cache:
+        frames = list(iter_derived(parquet_path, use_cache=False, batch_size=batch_size))
+        derived = pd.concat(frames, ignore_index=True) if frames else derive_columns(pd.DataFrame())
+        return derived if columns is None else derived[[col for col in columns if col in derived.columns]]
+    path = derived_path(parquet_path, cache_dir=cache_dir, max_size_mb=max_size_mb, batch_size=batch_size)
+    with stage('read_derived') as record:
+        if columns is not None:
+            columns = [col for col in columns if col in pq.read_schema(path).names]
+        derived = to_derived_frame(pq.read_table(path, columns=columns))
+        record['rows'] = len(derived)
+    return derived
@@ -0,0 +1,160 @@
+import pandas as pd
+import numpy as np
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from Instrumentare import instrumented
+
+# Numărul maxim de rânduri dintr-o foaie Excel (inclusiv antetul) și lungimea maximă a numelui foii
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_NAME_LENGTH = 31
+
+EXPORT_FORMATS = ('parquet', 'csv', 'xlsx')
+
+def open_workbook(path):
+    """
+    Deschide un fișier xlsx în modul `constant_memory` al xlsxwriter: fiecare rând
+    este scris pe disc imediat ce trecem la următorul, deci memoria nu crește cu
+    numărul de rânduri exportate. Textul este scris ca text: URL-urile nu devin
+    hyperlink-uri (Excel acceptă cel mult 65.530 pe foaie), iar valorile care încep cu
+    '=' nu devin formule.
+    """
+    import xlsxwriter
+    return xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+        'nan_inf_to_errors': True,
+        'remove_timezone': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+
+def _excel_cell(value):
+    """Valoarea unei celule: lipsă -> celulă goală, liste / dicționare / tipuri -> forma lor text."""
+    if isinstance(value, (list, tuple, dict, set, np.ndarray, np.dtype, pd.api.extensions.ExtensionDtype)):
+        return str(value)
+    if pd.isna(value):
+        return None
+    return value
+
+def _excel_columns(df):
+    """Coloanele cadrului convertite la liste de valori Python acceptate de xlsxwriter."""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            values = series.astype(object).where(series.notna(), None)
+            columns.append(values.tolist())
+        else:
+            columns.append([_excel_cell(value) for value in series.tolist()])
+    return columns
+
+def _sheet_part_name(sheet_name, part):
+    """Numele foii pentru a `part`-a parte (prima parte păstrează numele cerut)."""
+    if part == 1:
+        return sheet_name[:SHEET_NAME_LENGTH]
+    suffix = f'_{part}'
+    return sheet_name[:SHEET_NAME_LENGTH - len(suffix)] + suffix
+
+def write_frames(workbook, sheet_name, frames, index=False, max_rows=EXCEL_MAX_ROWS):
+    """
+    Scrie o succesiune de DataFrame-uri (de ex. loturile din Incarcare.iter_batches)
+    într-o foaie, rând cu rând. Când foaia atinge `max_rows` rânduri, scrierea continuă
+    într-o foaie nouă (`sheet_name_2`, `sheet_name_3`, ...), cu același antet.
+    Returnează numărul de rânduri de date scrise.
+    """
+    worksheet = None
+    part = 0
+    row = 0
+    written = 0
+    header = None
+    for frame in frames:
+        if index:
+            frame = frame.reset_index()
+        if header is None:
+            header = [str(col) for col in frame.columns]
+        for values in zip(*_excel_columns(frame)):
+            if worksheet is None or row >= max_rows:
+                part += 1
+                worksheet = workbook.add_worksheet(_sheet_part_name(sheet_name, part))
+                worksheet.write_row(0, 0, header)
+                row = 1
+            worksheet.write_row(row, 0, values)
+            row += 1
+            written += 1
+
+    # Un cadru gol produce totuși foaia, cu antetul
+    if worksheet is None:
+        worksheet = workbook.add_worksheet(_sheet_part_name(sheet_name, 1))
+        worksheet.write_row(0, 0, header or [])
+    return written
+
+@instrumented('excel_sheet', rows=lambda workbook, sheet_name, df, *args, **kwargs: len(df))
+def write_sheet(workbook, sheet_name, df, index=False, max_rows=EXCEL_MAX_ROWS):
+    """Scrie un singur DataFrame într-o foaie (împărțită la nevoie, vezi write_frames)."""
+    return write_frames(workbook, sheet_name, [df], index=index, max_rows=max_rows)
+
+def write_excel(path, sheets, index=False, max_rows=EXCEL_MAX_ROWS):
+    """Scrie un fișier xlsx cu câte o foaie pentru fiecare pereche nume -> DataFrame din `sheets`."""
+    workbook = open_workbook(path)
+    try:
+        for sheet_name, df in sheets.items():
+            write_sheet(workbook, sheet_name, df, index=index, max_rows=max_rows)
+    finally:
+        workbook.close()
+
+@instrumented('export', rows=lambda df, *args, **kwargs: len(df))
+def write_table(df, path, export_format='parquet'):
+    """
+    Exportă un DataFrame în formatul cerut: 'parquet' (implicit, cel mai rapid și mai
+    compact), 'csv' sau 'xlsx' (în flux, vezi write_frames). Extensia este adăugată
+    la `path`; returnează calea fișierului scris.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format de export necunoscut: {export_format} (formate: {', '.join(EXPORT_FORMATS)})")
+    path = f'{path}.{export_format}'
+    if export_format == 'parquet':
+        df.to_parquet(path, index=False)
+    elif export_format == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        write_excel(path, {'Sheet1': df})
+    return path
+
+def _open_batch_writer(path, export_format, schema):
+    """Scriitorul Arrow în flux pentru formatul cerut (parquet sau csv)."""
+    if export_format == 'parquet':
+        return pq.ParquetWriter(path, schema)
+    return pa_csv.CSVWriter(path, schema)
+
+def write_batches(batches, path, export_format='parquet', schema=None):
+    """
+    Exportă în flux o succesiune de tabele Arrow (de ex. Incarcare.iter_batches cu
+    `to_pandas=False`), fără să țină tot rezultatul în memorie. Extensia este adăugată
+    la `path`; returnează calea fișierului și numărul de rânduri scrise.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format de export necunoscut: {export_format} (formate: {', '.join(EXPORT_FORMATS)})")
+    path = f'{path}.{export_format}'
+    if export_format == 'xlsx':
+        workbook = open_workbook(path)
+        try:
+            rows = write_frames(workbook, 'Sheet1', (table.to_pandas() for table in batches))
+        finally:
+            workbook.close()
+        return path, rows
+
+    rows = 0
+    writer = None
+    try:
+        for table in batches:
+            if writer is None:
+                writer = _open_batch_writer(path, export_format, schema or table.schema)
+            writer.write_table(table)
+            rows += table.num_rows
+        # Fără niciun lot, fișierul conține doar schema (antetul)
+        if writer is None and schema is not None:
+            writer = _open_batch_writer(path, export_format, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path, rows
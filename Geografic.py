@@ -0,0 +1,154 @@
+import pandas as pd
+import numpy as np
+from Tipuri import to_numeric_column
+from Normalizare import normalize_series
+from Blocking import generate_candidate_pairs
+from Potrivire import score_index_pairs
+from Instrumentare import instrumented
+
+EARTH_RADIUS_KM = 6371.0088
+LATITUDE_COLUMN = 'main_latitude'
+LONGITUDE_COLUMN = 'main_longitude'
+
+# Celulele grilei sunt împachetate într-o singură cheie int64, câte 21 de biți pe axă
+CELL_BITS = 21
+CELL_OFFSET = 1 << (CELL_BITS - 1)
+# Vecinii „înainte” ai unei celule (plus celula însăși): fiecare pereche de celule vecine
+# apare o singură dată, deci o pereche de puncte nu este generată de două ori
+FORWARD_OFFSETS = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                   if (dx, dy, dz) > (0, 0, 0)]
+# Toate celulele vecine, plus celula însăși
+NEIGHBOUR_OFFSETS = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+def cell_shift(dx, dy, dz):
+    """Diferența dintre cheia unei celule și cheia vecinului ei aflat la (dx, dy, dz)."""
+    return (dx << (2 * CELL_BITS)) + (dy << CELL_BITS) + dz
+
+def parse_coordinates(df, latitude_column=LATITUDE_COLUMN, longitude_column=LONGITUDE_COLUMN):
+    """
+    Latitudinea și longitudinea ca array-uri float64 (coloanele sunt salvate ca text);
+    valorile lipsă, nenumerice sau în afara intervalelor [-90, 90] / [-180, 180] devin NaN.
+    """
+    latitude, longitude = [to_numeric_column(df[col], 'float64').to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+                           for col in (latitude_column, longitude_column)]
+    invalid = (np.abs(latitude) > 90) | (np.abs(longitude) > 180)
+    latitude[invalid] = np.nan
+    longitude[invalid] = np.nan
+    return latitude, longitude
+
+def unit_vectors(latitude, longitude):
+    """Punctele de pe sferă ca vectori unitari 3D (n x 3)."""
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def chord_length(radius_km):
+    """Lungimea coardei (pe sfera unitate) dintre două puncte aflate la `radius_km` km pe suprafață."""
+    return 2 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+def cell_keys(vectors, radius_km):
+    """
+    Cheia celulei fiecărui punct într-o grilă 3D uniformă cu latura egală cu coarda lui
+    `radius_km`: două puncte la cel mult `radius_km` km sunt în aceeași celulă sau în celule
+    vecine, indiferent de latitudine (grila nu deformează distanțele ca una pe lat/lon).
+    """
+    cells = np.floor(vectors / chord_length(radius_km)).astype(np.int64) + CELL_OFFSET
+    if cells.min() < 0 or cells.max() >= 1 << CELL_BITS:
+        raise ValueError(f"Raza de {radius_km} km este prea mică pentru grila geografică")
+    return (cells[:, 0] << (2 * CELL_BITS)) | (cells[:, 1] << CELL_BITS) | cells[:, 2]
+
+def cell_pairs(rows, keys):
+    """
+    Perechile de poziții (i, j), i < j, ale punctelor din aceeași celulă sau din celule
+    vecine (hash join pe cheile celulelor, câte unul pentru fiecare vecin).
+    """
+    if len(rows) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    points = pd.DataFrame({'key': keys, 'row': rows})
+    same = points.merge(points, on='key')
+    first, second = [same['row_x'].to_numpy()], [same['row_y'].to_numpy()]
+    for dx, dy, dz in FORWARD_OFFSETS:
+        shift = cell_shift(dx, dy, dz)
+        neighbours = points.merge(points.assign(key=points['key'] - shift), on='key')
+        first.append(neighbours['row_x'].to_numpy())
+        second.append(neighbours['row_y'].to_numpy())
+    first, second = np.concatenate(first), np.concatenate(second)
+    keep = first != second
+    first, second = first[keep], second[keep]
+    n = int(rows.max()) + 1
+    pairs = np.unique(np.minimum(first, second) * n + np.maximum(first, second))
+    return pairs // n, pairs % n
+
+def great_circle_km(vectors, first, second):
+    """Distanța pe suprafața Pământului (km) dintre perechile de puncte, din coarda dintre ele."""
+    chord = np.linalg.norm(vectors[first] - vectors[second], axis=1)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+@instrumented('geo_blocking', rows=lambda df, *args, **kwargs: len(df))
+def geo_candidate_pairs(df, radius_km=1.0, max_cell_size=200, names=None,
+                        latitude_column=LATITUDE_COLUMN, longitude_column=LONGITUDE_COLUMN):
+    """
+    Perechile de poziții (i, j), i < j, ale companiilor aflate la cel mult `radius_km` km una
+    de alta, cu distanța lor în km. Rândurile fără coordonate valide nu apar în perechi.
+
+    Celulele cu mai mult de `max_cell_size` companii (centrul unui oraș mare) nu sunt
+    comparate complet: pentru ele perechile sunt generate doar din indexul de blocare pe
+    nume (Blocking.py) al companiilor din celulă și din cele 26 de celule vecine, deci și
+    perechile de o parte și de alta a marginii celulei sunt găsite. `names` (numele
+    normalizate, pe poziții) trebuie dat pentru ca aceste celule să fie acoperite.
+    """
+    latitude, longitude = parse_coordinates(df, latitude_column, longitude_column)
+    rows = np.flatnonzero(~np.isnan(latitude) & ~np.isnan(longitude))
+    if len(rows) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    vectors = np.zeros((len(df), 3))
+    vectors[rows] = unit_vectors(latitude[rows], longitude[rows])
+    keys = cell_keys(vectors[rows], radius_km)
+
+    codes, counts = np.unique(keys, return_inverse=True, return_counts=True)[1:]
+    dense = counts[codes] > max_cell_size
+    first, second = cell_pairs(rows[~dense], keys[~dense])
+
+    # Celulele dense: doar perechile care împart o q-gramă rară a numelui, căutate în celula
+    # densă și în vecinii ei; se păstrează perechile cu cel puțin un rând din celula densă
+    if names is not None and dense.any():
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        shifts = np.array([cell_shift(*offset) for offset in NEIGHBOUR_OFFSETS], dtype=np.int64)
+        dense_first, dense_second = [first], [second]
+        for key in np.unique(keys[dense]):
+            starts = np.searchsorted(sorted_keys, key + shifts, side='left')
+            ends = np.searchsorted(sorted_keys, key + shifts, side='right')
+            positions = np.concatenate([order[start:end] for start, end in zip(starts, ends)])
+            members, in_cell = rows[positions], keys[positions] == key
+            candidates = generate_candidate_pairs([names[i] for i in members])
+            if candidates:
+                candidates = np.array(sorted(candidates), dtype=np.int64)
+                candidates = candidates[in_cell[candidates[:, 0]] | in_cell[candidates[:, 1]]]
+                dense_first.append(members[candidates[:, 0]])
+                dense_second.append(members[candidates[:, 1]])
+        # Perechile dintre două celule dense vecine sunt găsite de ambele
+        first, second = np.concatenate(dense_first), np.concatenate(dense_second)
+        pairs = np.unique(np.minimum(first, second) * len(df) + np.maximum(first, second))
+        first, second = pairs // len(df), pairs % len(df)
+
+    distance = great_circle_km(vectors, first, second)
+    keep = distance <= radius_km
+    return first[keep], second[keep], distance[keep]
+
+def geo_name_pairs(df, radius_km=1.0, threshold=85, name_column='company_name', max_cell_size=200, workers=-1,
+                   normalized_names=None):
+    """
+    Perechile de poziții (i, j, similaritate) ale companiilor aflate la cel mult `radius_km` km
+    una de alta și cu nume similare (peste `threshold`, comparând numele preprocesate).
+    Doar perechile apropiate geografic ajung la potrivirea fuzzy, deci două filiale cu același
+    nume din orașe diferite nu sunt legate. `normalized_names` sunt numele deja preprocesate,
+    pe pozițiile rândurilor din `df`.
+    """
+    if normalized_names is None:
+        normalized_names = normalize_series(df[name_column])
+    names = ['' if pd.isna(name) else str(name) for name in normalized_names]
+    first, second, _ = geo_candidate_pairs(df, radius_km=radius_km, max_cell_size=max_cell_size, names=names)
+    scores = score_index_pairs(names, zip(first.tolist(), second.tolist()), workers=workers)
+    has_name = np.array([bool(name) for name in names], dtype=bool)
+    keep = (scores > threshold) & has_name[first] & has_name[second]
+    return list(zip(first[keep].tolist(), second[keep].tolist(), scores[keep].tolist()))
@@ -0,0 +1,95 @@
+import pandas as pd
+import numpy as np
+import os
+from Schite import tree_reduce
+
+# Modulele de grafice (matplotlib, seaborn) sunt importate doar de etapele care desenează,
+# ca scripturile care nu desenează nimic să pornească fără ele
+
+def pyplot():
+    """
+    Modulul matplotlib.pyplot, importat la prima folosire, cu backend-ul fără afișare
+    'Agg' (graficele sunt doar salvate în fișiere). Un backend ales explicit prin
+    variabila de mediu MPLBACKEND este păstrat.
+    """
+    import matplotlib
+    if 'MPLBACKEND' not in os.environ:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def seaborn():
+    """Modulul seaborn, importat la prima folosire (după pyplot, deci tot cu backend-ul 'Agg')."""
+    pyplot()
+    import seaborn as sns
+    return sns
+
+def histogram_edges(minimum, maximum, bins=50):
+    """
+    Marginile celor `bins` intervale egale dintre `minimum` și `maximum` (un singur interval
+    de lățime 1 dacă valorile sunt egale); None dacă o limită lipsește.
+    """
+    if pd.isna(minimum) or pd.isna(maximum):
+        return None
+    minimum, maximum = float(minimum), float(maximum)
+    if not (np.isfinite(minimum) and np.isfinite(maximum)):
+        return None
+    if minimum == maximum:
+        minimum, maximum = minimum - 0.5, maximum + 0.5
+    return np.linspace(minimum, maximum, bins + 1)
+
+def partition_histograms(df, edges):
+    """Numărul valorilor din fiecare interval, pe coloană (coloană -> margini), pentru o partiție."""
+    counts = {}
+    for col, col_edges in edges.items():
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        counts[col] = np.histogram(values[np.isfinite(values)], bins=col_edges)[0]
+    return counts
+
+def merge_histograms(counts1, counts2):
+    """Combină histogramele a două partiții (aceleași intervale) prin adunare."""
+    return {col: counts1[col] + counts2[col] for col in counts1}
+
+def dask_histograms(df, columns, bins=50, ranges=None):
+    """
+    Histogramele coloanelor numerice `columns` ale DataFrame-ului dask, pe tot setul de date:
+    valorile sunt numărate pe intervale în fiecare partiție, iar histogramele partițiilor sunt
+    combinate în arbore, deci memoria nu depinde de numărul de rânduri. `ranges`
+    (coloană -> (minim, maxim), de ex. din describe()) evită o parcurgere în plus a datelor
+    pentru limitele coloanelor care apar în el.
+
+    Returnează coloană -> (numere, margini), pentru coloanele cu cel puțin o valoare.
+    """
+    import dask
+    ranges = dict(ranges or {})
+    missing = [col for col in columns if col not in ranges]
+    if missing:
+        minimum, maximum = dask.compute(df[missing].min(), df[missing].max())
+        ranges.update({col: (minimum[col], maximum[col]) for col in missing})
+    edges = {}
+    for col in columns:
+        col_edges = histogram_edges(*ranges[col], bins=bins)
+        if col_edges is not None:
+            edges[col] = col_edges
+    if not edges:
+        return {}
+
+    histograms = [dask.delayed(partition_histograms)(part, edges) for part in df[list(edges)].to_delayed()]
+    counts = tree_reduce(histograms, merge_histograms).compute()
+    return {col: (counts[col], edges[col]) for col in edges}
+
+def save_histograms(histograms, path):
+    """
+    Desenează histogramele deja calculate (coloană -> (numere, margini)), câte una pe rând,
+    și le salvează în `path`; matplotlib primește doar numerele pe intervale, nu valorile.
+    """
+    plt = pyplot()
+    fig, axes = plt.subplots(len(histograms), 1, figsize=(12, 5 * len(histograms)), squeeze=False)
+    for ax, (col, (counts, edges)) in zip(axes[:, 0], histograms.items()):
+        ax.stairs(counts, edges, fill=True)
+        ax.set_title(f'Distribuția pentru {col}')
+        ax.set_xlabel(col)
+        ax.set_ylabel('Număr de rânduri')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
@@ -0,0 +1,113 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+import os
+
+# Fișierele de intrare implicite (pot fi schimbate din linia de comandă, vezi dataforge.py)
+DEFAULT_INPUT = 'Tensorflow.parquet'
+DEFAULT_SECOND_INPUT = 'veridion_entity_resolution_challenge.snappy.parquet'
+
+def parquet_columns(parquet_path):
+    """Returnează numele coloanelor din schema fișierului parquet, fără să citească datele."""
+    return pq.read_schema(parquet_path).names
+
+def available_columns(parquet_path, columns):
+    """Returnează coloanele cerute care există în fișier, în ordinea cerută."""
+    schema_columns = set(parquet_columns(parquet_path))
+    return [col for col in columns if col in schema_columns]
+
+def _filter_columns(filters):
+    """Coloanele folosite în filtre, pentru filtrele în formatul pyarrow (listă de tupluri)."""
+    if not filters:
+        return []
+    groups = filters if isinstance(filters[0], list) else [filters]
+    return [name for group in groups for name, _, _ in group]
+
+def load_table(parquet_path=DEFAULT_INPUT, columns=None, filters=None, cache_path=None, use_cache=True):
+    """
+    Citește un fișier parquet ca tabel Arrow, decodând doar coloanele cerute.
+
+    `columns` limitează coloanele citite, iar `filters` (format pyarrow, de ex.
+    [('main_country_code', '==', 'US')]) este împins în cititor, astfel încât
+    row group-urile care nu se potrivesc nu sunt decodate deloc.
+
+    Cache-ul Arrow IPC (Feather) de lângă fișier este refolosit (memory-mapped)
+    cât timp este mai nou decât fișierul parquet. El este scris doar la o citire
+    completă, fără coloane sau filtre.
+    """
+    if cache_path is None:
+        cache_path = os.path.splitext(parquet_path)[0] + '.feather'
+
+    if use_cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(parquet_path):
+        read_columns = None
+        if columns is not None:
+            read_columns = list(columns) + [col for col in _filter_columns(filters) if col not in columns]
+        table = feather.read_table(cache_path, columns=read_columns, memory_map=True)
+        if filters:
+            table = table.filter(pq.filters_to_expression(filters))
+        if columns is not None:
+            table = table.select(list(columns))
+        return table
+
+    table = pq.read_table(parquet_path, columns=columns, filters=filters)
+    if use_cache and columns is None and not filters:
+        # Scris întâi într-un fișier temporar, ca o scriere întreruptă să nu lase un cache trunchiat
+        feather.write_feather(table, f'{cache_path}.partial')
+        os.replace(f'{cache_path}.partial', cache_path)
+    return table
+
+def load_dataset(parquet_path=DEFAULT_INPUT, columns=None, filters=None, cache_path=None, use_cache=True):
+    """Varianta pandas a load_table: citește doar coloanele și rândurile cerute."""
+    return load_table(parquet_path, columns=columns, filters=filters,
+                      cache_path=cache_path, use_cache=use_cache).to_pandas()
+
+def iter_batches(parquet_path, columns=None, filters=None, batch_size=65536, to_pandas=True):
+    """
+    Parcurge fișierul parquet pe loturi de cel mult `batch_size` rânduri, decodând doar
+    coloanele cerute, astfel încât memoria folosită nu depinde de mărimea fișierului.
+    Filtrele (format pyarrow) sunt aplicate pe fiecare lot. Loturile sunt DataFrame-uri
+    pandas sau, cu `to_pandas=False`, tabele Arrow.
+    """
+    parquet_file = pq.ParquetFile(parquet_path)
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns) + [col for col in _filter_columns(filters) if col not in columns]
+    expression = pq.filters_to_expression(filters) if filters else None
+
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=read_columns):
+        table = pa.Table.from_batches([batch])
+        if expression is not None:
+            table = table.filter(expression)
+        if columns is not None:
+            table = table.select(list(columns))
+        yield table.to_pandas() if to_pandas else table
+
+def write_feather_cache(parquet_path, cache_path=None, batch_size=65536):
+    """
+    Scrie cache-ul Arrow IPC (Feather) pe loturi, fără să încarce tot fișierul în memorie.
+    Fișierul este scris întâi ca `.partial` și redenumit la final, deci cache-ul nu este
+    niciodată trunchiat. Returnează numărul de rânduri scrise.
+    """
+    if cache_path is None:
+        cache_path = os.path.splitext(parquet_path)[0] + '.feather'
+    parquet_file = pq.ParquetFile(parquet_path)
+    rows = 0
+    options = pa.ipc.IpcWriteOptions(compression='lz4')
+    with pa.ipc.new_file(f'{cache_path}.partial', parquet_file.schema_arrow, options=options) as writer:
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    os.replace(f'{cache_path}.partial', cache_path)
+    return rows
+
+def read_head(parquet_path, n=5, columns=None):
+    """Citește doar primele `n` rânduri din fișier, pentru previzualizare."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    for batch in parquet_file.iter_batches(batch_size=n, columns=columns):
+        return batch.to_pandas()
+    return parquet_file.schema_arrow.empty_table().to_pandas()
+
+def load_dask_dataset(parquet_path=DEFAULT_INPUT, columns=None, filters=None):
+    """Citește fișierul cu Dask, cu aceleași coloane și filtre împinse în cititorul parquet."""
+    import dask.dataframe as dd
+    return dd.read_parquet(parquet_path, columns=columns, filters=filters)
@@ -0,0 +1,132 @@
+import pandas as pd
+import numpy as np
+import sqlite3
+from Blocking import name_qgrams, similar_name_pairs
+from Clustering import union_pairs
+from Normalizare import normalize_series
+from Potrivire import ratio_pairs
+
+# Indexul persistent al entităților deja văzute: hash-ul cheii compuse -> cluster,
+# numele reprezentativ al fiecărui cluster și cheile de blocare (q-grame) ale acestuia.
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS key_hashes (key_hash INTEGER PRIMARY KEY, cluster_id INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS entities (cluster_id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blocking_keys (block_key TEXT NOT NULL, cluster_id INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_blocking_keys ON blocking_keys (block_key);
+CREATE TABLE IF NOT EXISTS block_sizes (block_key TEXT PRIMARY KEY, size INTEGER NOT NULL);
+"""
+
+def open_index(index_path='entity_index.sqlite'):
+    """Deschide (și creează la nevoie) indexul de entități din fișierul SQLite."""
+    conn = sqlite3.connect(index_path)
+    conn.executescript(INDEX_SCHEMA)
+    return conn
+
+def lookup_key_hashes(conn, key_hashes):
+    """Clusterul din index pentru fiecare hash al cheii compuse (-1 dacă hash-ul este nou)."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_keys (position INTEGER PRIMARY KEY, key_hash INTEGER)")
+    conn.execute("DELETE FROM batch_keys")
+    conn.executemany("INSERT INTO batch_keys VALUES (?, ?)", enumerate(key_hashes.tolist()))
+    clusters = np.full(len(key_hashes), -1, dtype=np.int64)
+    for position, cluster_id in conn.execute(
+            "SELECT b.position, k.cluster_id FROM batch_keys b JOIN key_hashes k ON k.key_hash = b.key_hash"):
+        clusters[position] = cluster_id
+    return clusters
+
+def lookup_similar_names(conn, names, threshold=85, max_block_size=200, workers=-1):
+    """
+    Caută pentru fiecare nume (preprocesat) clusterul din index cu numele cel mai
+    similar, peste `threshold`. Sunt comparate doar clusterele care au o q-gramă comună
+    cu numele, ignorând q-gramele prezente la mai mult de `max_block_size` clustere.
+    Returnează -1 pentru numele fără potrivire.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_grams (position INTEGER, block_key TEXT)")
+    conn.execute("DELETE FROM batch_grams")
+    conn.executemany("INSERT INTO batch_grams VALUES (?, ?)",
+                     ((position, gram) for position, name in enumerate(names) for gram in name_qgrams(name)))
+    candidates = conn.execute("""
+        SELECT DISTINCT g.position, e.cluster_id, e.name
+        FROM batch_grams g
+        JOIN block_sizes s ON s.block_key = g.block_key AND s.size <= ?
+        JOIN blocking_keys b ON b.block_key = g.block_key
+        JOIN entities e ON e.cluster_id = b.cluster_id
+        ORDER BY g.position, e.cluster_id
+    """, (max_block_size,)).fetchall()
+
+    best_cluster = np.full(len(names), -1, dtype=np.int64)
+    if not candidates:
+        return best_cluster
+    positions = np.array([position for position, _, _ in candidates])
+    scores = ratio_pairs([names[position] for position in positions],
+                         [name for _, _, name in candidates], workers=workers)
+    best_score = np.full(len(names), threshold, dtype=np.int64)
+    for position, (_, cluster_id, _), score in zip(positions, candidates, scores):
+        if score > best_score[position]:
+            best_score[position] = score
+            best_cluster[position] = cluster_id
+    return best_cluster
+
+def add_entities(conn, cluster_ids, names):
+    """Adaugă clusterele noi în index, împreună cu cheile lor de blocare."""
+    conn.executemany("INSERT INTO entities VALUES (?, ?)", zip(cluster_ids, names))
+    grams = [(gram, cluster_id) for cluster_id, name in zip(cluster_ids, names) for gram in name_qgrams(name)]
+    conn.executemany("INSERT INTO blocking_keys VALUES (?, ?)", grams)
+    conn.executemany("""
+        INSERT INTO block_sizes VALUES (?, 1)
+        ON CONFLICT (block_key) DO UPDATE SET size = size + 1
+    """, ((gram,) for gram, _ in grams))
+
+def match_batch(conn, key_hashes, names=None, threshold=85, max_block_size=200, workers=-1, normalized_names=None):
+    """
+    Potrivește un lot nou de rânduri cu indexul persistent și actualizează indexul.
+
+    Fiecare rând primește clusterul unui hash de cheie deja cunoscut, altfel al celui
+    mai similar nume din index, altfel un cluster nou (rândurile noi cu nume similare
+    între ele sunt grupate împreună). Costul depinde de mărimea lotului, nu de istoric.
+
+    `normalized_names` sunt numele deja preprocesate (de ex. din cache-ul Derivate.py),
+    folosite în locul preprocesării lui `names`.
+
+    Returnează (cluster_ids, duplicates_mask); un rând este duplicat dacă entitatea lui
+    exista deja în index sau a mai apărut mai devreme în același lot.
+    """
+    key_hashes = np.asarray(key_hashes, dtype=np.uint64).view(np.int64)
+    if names is None:
+        normalized = [''] * len(key_hashes)
+    elif normalized_names is None:
+        normalized = normalize_series(pd.Series(names, dtype=object)).tolist()
+    else:
+        normalized = ['' if pd.isna(name) else str(name) for name in normalized_names]
+
+    clusters = lookup_key_hashes(conn, key_hashes)
+    first_occurrence = ~pd.Series(key_hashes).duplicated().to_numpy()
+    pending = np.flatnonzero((clusters < 0) & first_occurrence)
+
+    # Hash-urile noi: căutăm întâi un nume similar în istoric
+    if len(pending) and names is not None:
+        clusters[pending] = lookup_similar_names(conn, [normalized[i] for i in pending],
+                                                 threshold=threshold, max_block_size=max_block_size,
+                                                 workers=workers)
+
+    # Rândurile rămase formează clustere noi; cele cu nume similare între ele sunt unite
+    new_rows = pending[clusters[pending] < 0]
+    new_names = [normalized[row] for row in new_rows]
+    pairs = [(i, j) for i, j, _ in similar_name_pairs(new_names, threshold=threshold, compare_normalized=True,
+                                                       workers=workers, normalized_names=new_names)]
+    _, root_codes = np.unique(union_pairs(len(new_rows), pairs), return_inverse=True)
+    next_cluster = conn.execute("SELECT COALESCE(MAX(cluster_id), -1) + 1 FROM entities").fetchone()[0]
+    clusters[new_rows] = next_cluster + root_codes
+
+    # Repetițiile unui hash din același lot primesc clusterul primei apariții
+    clusters = pd.Series(clusters[first_occurrence], index=key_hashes[first_occurrence]).reindex(key_hashes).to_numpy()
+
+    new_cluster_rows = pd.Series(clusters).where(clusters >= next_cluster)
+    unique_mask = new_cluster_rows.notna().to_numpy() & ~new_cluster_rows.duplicated().to_numpy()
+
+    # Salvăm în index hash-urile noi și clusterele noi
+    conn.executemany("INSERT INTO key_hashes VALUES (?, ?)",
+                     zip(key_hashes[pending].tolist(), clusters[pending].tolist()))
+    add_entities(conn, clusters[unique_mask].tolist(), [normalized[row] for row in np.flatnonzero(unique_mask)])
+    conn.commit()
+
+    return clusters, ~unique_mask
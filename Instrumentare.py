@@ -0,0 +1,249 @@
+import cProfile
+import contextvars
+import functools
+import json
+import os
+import platform
+import threading
+import time
+import tracemalloc
+import psutil
+from contextlib import contextmanager
+from datetime import datetime
+
+MB = 1024 * 1024
+
+# Raportul rulării curente; etapele și funcțiile decorate se înregistrează în el
+_active_report = contextvars.ContextVar('active_report', default=None)
+
+class PeakMemory:
+    """
+    Urmărește memoria maximă (RSS) a procesului cât timp blocul `with` rulează,
+    citind-o la fiecare `interval` secunde dintr-un fir separat.
+    """
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self.process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        return False
+
+class StageReport:
+    """
+    Raportul pe etape al unei rulări: pentru fiecare etapă timpul, numărul de rânduri,
+    debitul și memoria (RSS la început / sfârșit / maximă). Opțional, `profile=True`
+    rulează cProfile pe toată rularea, iar `trace_memory=True` pornește tracemalloc și
+    adaugă memoria maximă alocată din Python pe etapă și liniile care alocă cel mai mult.
+    Raportul este salvat ca JSON în `output` (iar profilul cProfile lângă el, `.prof`).
+    """
+    def __init__(self, name, output=None, profile=False, trace_memory=False, verbose=True):
+        self.name = name
+        self.output = output
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.verbose = verbose
+        self.stages = []
+        self.started_at = None
+        self.seconds = None
+        self.top_allocations = []
+        self._stack = []
+        self._start = None
+        self._token = None
+        self._profiler = None
+        self._own_tracemalloc = False
+
+    def __enter__(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._token = _active_report.set(self)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+        if tracemalloc.is_tracing() and self.trace_memory:
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:20]
+            self.top_allocations = [{'location': str(stat.traceback), 'size_mb': round(stat.size / MB, 3),
+                                     'count': stat.count} for stat in statistics]
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+                self._own_tracemalloc = False
+        _active_report.reset(self._token)
+        return False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Măsoară blocul `with` ca etapă `name` (etapele imbricate primesc numele
+        părinte/copil). Numărul de rânduri poate fi dat aici sau completat în blocul
+        `with` prin înregistrarea primită: `record['rows'] = len(df)`.
+        """
+        frame = {'name': name, 'traced_peak': 0}
+        record = {'stage': '/'.join([parent['name'] for parent in self._stack] + [name]), 'rows': rows}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            if self._stack:
+                self._stack[-1]['traced_peak'] = max(self._stack[-1]['traced_peak'],
+                                                     tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+
+        memory = PeakMemory()
+        memory.__enter__()
+        start = time.perf_counter()
+        try:
+            yield record
+            record['error'] = None
+        except BaseException as e:
+            record['error'] = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            memory.__exit__(None, None, None)
+            self._stack.pop()
+            record['seconds'] = round(seconds, 4)
+            rows = record['rows']
+            record['rows_per_second'] = round(rows / seconds, 1) if rows and seconds > 0 else None
+            record['rss_start_mb'] = round(memory.start_rss / MB, 1)
+            record['rss_end_mb'] = round(memory.process.memory_info().rss / MB, 1)
+            record['rss_peak_mb'] = round(memory.peak_rss / MB, 1)
+            if tracing:
+                traced_peak = max(frame['traced_peak'], tracemalloc.get_traced_memory()[1])
+                record['traced_peak_mb'] = round(traced_peak / MB, 1)
+                if self._stack:
+                    self._stack[-1]['traced_peak'] = max(self._stack[-1]['traced_peak'], traced_peak)
+            self.stages.append(record)
+            if self.verbose:
+                rows_text = f" | {rows:,} rânduri" if rows else ""
+                print(f"[{self.name}] {record['stage']}: {seconds:.3f} s | "
+                      f"RSS maxim {record['rss_peak_mb']:.1f} MB{rows_text}")
+
+    def to_dict(self):
+        """Raportul în forma salvată ca JSON."""
+        return {
+            'pipeline': self.name,
+            'started_at': self.started_at,
+            'seconds': round(self.seconds, 4) if self.seconds is not None else None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stages': self.stages,
+            'top_allocations': self.top_allocations
+        }
+
+    def save(self, output=None):
+        """Scrie raportul JSON (și profilul cProfile, dacă a fost cerut); returnează calea raportului."""
+        output = output or self.output
+        if output is None:
+            return None
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        report = self.to_dict()
+        if self._profiler is not None:
+            report['cprofile'] = os.path.splitext(output)[0] + '.prof'
+            self._profiler.dump_stats(report['cprofile'])
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        return output
+
+    def summary(self):
+        """Tabelul text al etapelor (etapele de pe primul nivel și cele imbricate)."""
+        lines = [f"{'Etapă':<50} {'Timp (s)':>10} {'Rânduri':>12} {'RSS maxim (MB)':>15}"]
+        for record in self.stages:
+            rows = f"{record['rows']:,}" if record['rows'] else ''
+            lines.append(f"{record['stage']:<50} {record['seconds']:>10.3f} {rows:>12} {record['rss_peak_mb']:>15.1f}")
+        if self.seconds is not None:
+            lines.append(f"{'Total':<50} {self.seconds:>10.3f}")
+        return '\n'.join(lines)
+
+def active_report():
+    """Raportul rulării curente, sau None dacă nu rulează nicio etapă instrumentată."""
+    return _active_report.get()
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Etapa `name` în raportul activ (vezi StageReport.stage). Fără raport activ blocul
+    rulează neschimbat, iar înregistrarea primită este doar un dicționar temporar.
+    """
+    report = _active_report.get()
+    if report is None:
+        yield {'stage': name, 'rows': rows}
+        return
+    with report.stage(name, rows=rows) as record:
+        yield record
+
+def instrumented(name=None, rows=None):
+    """
+    Decorator: fiecare apel al funcției devine etapa `name` (implicit numele funcției)
+    în raportul activ. `rows`, dacă este dat, primește argumentele apelului și
+    returnează numărul de rânduri procesate. Fără raport activ funcția rulează neschimbată.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            report = _active_report.get()
+            if report is None:
+                return func(*args, **kwargs)
+            with report.stage(stage_name, rows=rows(*args, **kwargs) if rows else None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def pipeline(name, output_dir='stage_reports'):
+    """
+    Decorator pentru funcțiile de analiză: fiecare rulare primește un StageReport,
+    salvat la final în `output_dir`/`name`_<timestamp>.json și afișat ca tabel.
+    Funcția decorată acceptă în plus argumentul `report` (un StageReport propriu, de ex.
+    cu `profile=True` / `trace_memory=True`). Apelată dintr-o altă rulare instrumentată,
+    funcția devine o etapă a raportului acesteia.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, report=None, **kwargs):
+            if report is None and _active_report.get() is not None:
+                with _active_report.get().stage(name):
+                    return func(*args, **kwargs)
+
+            if report is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                report = StageReport(name, output=os.path.join(output_dir, f'{name}_{timestamp}.json'))
+            try:
+                with report:
+                    return func(*args, **kwargs)
+            finally:
+                print(f"\nProfil pe etape ({name}):")
+                print(report.summary())
+                path = report.save()
+                if path:
+                    print(f"Raportul pe etape a fost salvat în '{path}'")
+        return wrapper
+    return decorator
@@ -0,0 +1,177 @@
+import pandas as pd
+import numpy as np
+from Blocking import name_qgrams, rarest_qgrams, build_blocking_index
+from Potrivire import ratio_pairs
+from Normalizare import frequent_keys
+from Incarcare import DEFAULT_INPUT, DEFAULT_SECOND_INPUT
+from Derivate import (KEY_COLUMNS, NAME_COLUMN, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB, key_column,
+                      derive_columns, load_derived, iter_derived)
+from Export import write_table
+from Instrumentare import pipeline, stage
+
+# Cheile exacte după care sunt legate rândurile celor două seturi (hash join)
+LINK_KEY_COLUMNS = KEY_COLUMNS
+# Regula potrivirii fuzzy pe nume, în blocuri după oraș
+NAME_CITY_RULE = 'name_city'
+
+def key_rows(derived, column):
+    """
+    Hash-urile cheii exacte `column` (coloana 'key') și pozițiile rândurilor care o au ('row'),
+    din coloanele derivate (Derivate.derive_columns). Join-ul pe hash-uri evită compararea șirurilor.
+    """
+    hashes = derived[key_column(column)]
+    present = hashes.notna().to_numpy()
+    return pd.DataFrame({'key': hashes[present].to_numpy(dtype=np.uint64), 'row': np.flatnonzero(present)})
+
+def name_city_candidates(index, frequency, names, cities, q=3, prefix_size=8, max_block_size=200):
+    """
+    Perechile candidate (poziție stânga, poziție dreapta) pentru numele din dreapta: doar
+    numele din același oraș care împart una dintre cele mai rare q-grame. Blocurile mai mari
+    decât `max_block_size` (q-grame foarte comune în oraș) sunt ignorate.
+    """
+    pairs = []
+    for right_idx, (name, city) in enumerate(zip(names, cities)):
+        if not city:
+            continue
+        name_grams = [gram for gram in name_qgrams(name, q) if gram in frequency]
+        candidates = set()
+        for gram in rarest_qgrams(name_grams, frequency, prefix_size):
+            members = index.get((city, gram), ())
+            if len(members) <= max_block_size:
+                candidates.update(members)
+        pairs.extend((left_idx, right_idx) for left_idx in candidates)
+    return pairs
+
+class LinkSide:
+    """
+    Setul din stânga, pregătit o singură dată pentru join din coloanele lui derivate:
+    hash-urile cheilor exacte (fără cheile prea frecvente), numele și orașele normalizate
+    și indexul de blocare pe (oraș, q-gramă) din Blocking.build_blocking_index.
+    """
+    def __init__(self, derived, key_columns, q=3, prefix_size=8, max_group_size=50):
+        self.keys = {}
+        for col in key_columns:
+            if key_column(col) in derived.columns:
+                keys = key_rows(derived, col)
+                self.keys[col] = keys[~keys['key'].isin(frequent_keys(keys, max_group_size))]
+        self.names = derived['name_normalized'].tolist() if 'name_normalized' in derived.columns else None
+        self.cities = derived['city_normalized'].tolist() if 'city_normalized' in derived.columns else None
+        self.index = self.frequency = None
+        if self.names is not None and self.cities is not None:
+            self.index, self.frequency = build_blocking_index(self.names, q=q, prefix_size=prefix_size,
+                                                              prefixes=self.cities, return_frequency=True)
+
+def link_batch(left, batch, offset=0, threshold=85, q=3, prefix_size=8, max_block_size=200,
+               max_group_size=50, workers=-1):
+    """
+    Legăturile dintre setul din stânga (LinkSide) și un lot din setul din dreapta
+    (coloanele lui derivate), ca tabel
+    lung: o linie pentru fiecare regulă care leagă perechea (left_row, right_row, rule, score).
+    Cheile exacte primesc scorul 100, iar perechile pe nume+oraș scorul fuzz.ratio al numelor.
+    `offset` este poziția primului rând din lot în fișierul din dreapta.
+    """
+    links = []
+    for col, left_keys in left.keys.items():
+        if key_column(col) not in batch.columns:
+            continue
+        right_keys = key_rows(batch, col)
+        right_keys = right_keys[~right_keys['key'].isin(frequent_keys(right_keys, max_group_size))]
+        matched = left_keys.merge(right_keys, on='key', suffixes=('_left', '_right'))
+        links.append(pd.DataFrame({'left_row': matched['row_left'].to_numpy(),
+                                   'right_row': matched['row_right'].to_numpy() + offset,
+                                   'rule': col, 'score': 100}))
+
+    if left.index is not None and 'name_normalized' in batch.columns and 'city_normalized' in batch.columns:
+        names = batch['name_normalized'].tolist()
+        cities = batch['city_normalized'].tolist()
+        pairs = name_city_candidates(left.index, left.frequency, names, cities, q=q,
+                                     prefix_size=prefix_size, max_block_size=max_block_size)
+        if pairs:
+            pairs = np.array(pairs, dtype=np.int64)
+            scores = ratio_pairs([left.names[i] for i in pairs[:, 0]], [names[j] for j in pairs[:, 1]],
+                                 workers=workers)
+            keep = scores > threshold
+            links.append(pd.DataFrame({'left_row': pairs[keep, 0], 'right_row': pairs[keep, 1] + offset,
+                                       'rule': NAME_CITY_RULE, 'score': scores[keep]}))
+
+    if not links:
+        return pd.DataFrame({'left_row': pd.Series(dtype='int64'), 'right_row': pd.Series(dtype='int64'),
+                             'rule': pd.Series(dtype=object), 'score': pd.Series(dtype='int64')})
+    return pd.concat(links, ignore_index=True)
+
+def summarize_links(links):
+    """
+    Tabelul de legături: o linie pentru fiecare pereche (left_row, right_row), cu regulile
+    care o leagă ('rules'), numărul de chei exacte comune ('exact_matches'), scorul numelor
+    ('name_score', 0 dacă numele nu depășesc pragul) și scorul maxim ('score').
+    """
+    # Fiecare regulă apare cel mult o dată pe pereche, deci regulile sunt adunate ca biți
+    rule_names = sorted(links['rule'].unique())
+    codes = pd.Categorical(links['rule'], categories=rule_names).codes
+    links = links.assign(rule_bits=np.left_shift(1, codes.astype(np.int64)),
+                         exact=(links['rule'] != NAME_CITY_RULE).astype(np.int64),
+                         name_score=links['score'].where(links['rule'] == NAME_CITY_RULE, 0))
+    summary = links.groupby(['left_row', 'right_row'], sort=True).agg(
+        rule_bits=('rule_bits', 'sum'), exact_matches=('exact', 'sum'),
+        name_score=('name_score', 'max'), score=('score', 'max')).reset_index()
+    labels = {bits: '+'.join(name for code, name in enumerate(rule_names) if bits >> code & 1)
+              for bits in summary['rule_bits'].unique()}
+    summary['rules'] = summary['rule_bits'].map(labels)
+    return summary[['left_row', 'right_row', 'rules', 'exact_matches', 'name_score', 'score']]
+
+@pipeline('link_datasets')
+def link_datasets(left_path=DEFAULT_INPUT, right_path=DEFAULT_SECOND_INPUT, key_columns=None, threshold=85,
+                  batch_size=65536, q=3, prefix_size=8, max_block_size=200, max_group_size=50, workers=-1,
+                  use_cache=True, cache_dir=DEFAULT_CACHE_DIR, max_cache_mb=DEFAULT_CACHE_SIZE_MB, left_df=None):
+    """
+    Leagă rândurile celor două fișiere care reprezintă aceeași companie:
+    - hash join pe cheile exacte normalizate (`key_columns`, implicit domeniu, email, telefon);
+    - potrivire fuzzy pe nume, comparând doar companiile din același oraș (blocare pe q-grame).
+
+    Doar setul din stânga (coloanele derivate) este ținut în memorie; setul din dreapta
+    este citit în loturi de `batch_size` rânduri, deci memoria nu crește cu mărimea lui.
+    Cheile care apar de mai mult de `max_group_size` ori într-un set sunt ignorate,
+    ca un email sau un telefon generic să nu producă milioane de perechi.
+    Coloanele derivate (nume normalizate, hash-urile cheilor) sunt citite din cache-ul
+    Derivate.py, deci la o nouă rulare pe aceleași fișiere nu mai sunt recalculate.
+    `left_df` este un DataFrame deja încărcat pentru setul din stânga.
+
+    Returnează tabelul de legături (vezi summarize_links), cu pozițiile rândurilor
+    în fișiere și numele companiilor.
+    """
+    if key_columns is None:
+        key_columns = LINK_KEY_COLUMNS
+    cache_options = {'use_cache': use_cache, 'cache_dir': cache_dir, 'max_size_mb': max_cache_mb,
+                     'batch_size': batch_size}
+
+    with stage('link_prepare_left') as record:
+        left_derived = derive_columns(left_df) if left_df is not None else load_derived(left_path, **cache_options)
+        record['rows'] = len(left_derived)
+        left = LinkSide(left_derived, key_columns, q=q, prefix_size=prefix_size, max_group_size=max_group_size)
+
+    links = []
+    offset = 0
+    with stage('link_batches') as record:
+        for batch in iter_derived(right_path, **cache_options):
+            batch_links = link_batch(left, batch, offset=offset, threshold=threshold, q=q, prefix_size=prefix_size,
+                                     max_block_size=max_block_size, max_group_size=max_group_size, workers=workers)
+            # Fiecare rând din dreapta apare într-un singur lot, deci perechile sunt rezumate pe lot
+            batch_links = summarize_links(batch_links)
+            if NAME_COLUMN in batch.columns:
+                batch_links.insert(2, 'right_name',
+                                   batch[NAME_COLUMN].astype(object).to_numpy()[batch_links['right_row'] - offset])
+            links.append(batch_links)
+            offset += len(batch)
+        record['rows'] = offset
+
+    link_table = pd.concat(links, ignore_index=True) if links else summarize_links(link_batch(left, pd.DataFrame()))
+    if NAME_COLUMN in left_derived.columns:
+        link_table.insert(2, 'left_name',
+                          left_derived[NAME_COLUMN].astype(object).to_numpy()[link_table['left_row']])
+    print(f"Legături găsite: {len(link_table)} perechi, "
+          f"{link_table['left_row'].nunique()} rânduri din stânga, {link_table['right_row'].nunique()} din dreapta")
+    return link_table
+
+if __name__ == "__main__":
+    link_table = link_datasets()
+    print(f"Tabelul de legături a fost salvat în '{write_table(link_table, 'company_links', 'parquet')}'")
@@ -0,0 +1,174 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from Normalizare import normalize_array
+from Instrumentare import instrumented
+
+# Câmpurile text comparate: etichetele, descrierile și numele comerciale
+TEXT_COLUMNS = ['business_tags', 'short_description', 'long_description', 'company_commercial_names']
+
+# Constantele finalizatorului splitmix64, folosit ca permutare a hash-urilor pe 64 de biți
+SPLITMIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+SPLITMIX_2 = np.uint64(0x94D049BB133111EB)
+# Multiplicator impar pentru combinarea hash-urilor pe 64 de biți (aritmetică modulo 2^64)
+MIX = np.uint64(0x9E3779B97F4A7C15)
+# Semnătura rândurilor fără text (nu intră în niciun bloc LSH)
+EMPTY = np.uint32(0xFFFFFFFF)
+
+def field_shingles(series, k=2):
+    """
+    Shingle-urile de `k` cuvinte ale unei coloane text, ca hash-uri pe 64 de biți, calculate
+    vectorizat cu Arrow: returnează pozițiile rândurilor și hash-urile (câte unul per shingle).
+    Textul este normalizat ca în Normalizare.normalize_series; un text cu mai puțin de `k`
+    cuvinte are un singur shingle, din toate cuvintele lui.
+    """
+    array = normalize_array(pa.array(series.astype('string[pyarrow]'), from_pandas=True))
+    # Textele goale devin lipsă, ca să nu producă un cuvânt gol
+    tokens = pc.utf8_split_whitespace(pc.if_else(pc.equal(array, ''), pa.scalar(None, array.type), array))
+    lengths = pc.fill_null(pc.list_value_length(tokens), 0).to_numpy(zero_copy_only=False).astype(np.int64)
+    words = tokens.flatten().to_numpy(zero_copy_only=False)
+    if len(words) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    word_hashes = pd.util.hash_array(words.astype(object))
+    word_rows = np.repeat(np.arange(len(lengths)), lengths)
+
+    # Shingle-ul care începe la cuvântul s: cuvintele s .. s + k - 1, toate din același rând
+    span = min(k, int(lengths.max()))
+    starts = np.arange(len(words) - span + 1)
+    starts = starts[word_rows[starts] == word_rows[starts + span - 1]]
+    hashes = word_hashes[starts].copy()
+    with np.errstate(over='ignore'):
+        for t in range(1, span):
+            hashes = hashes * MIX ^ word_hashes[starts + t]
+        # Textele mai scurte decât `span` cuvinte: un singur shingle din toate cuvintele
+        short_rows = np.flatnonzero((lengths > 0) & (lengths < span))
+        first = np.concatenate([[0], np.cumsum(lengths)[:-1]])[short_rows]
+        short_hashes = word_hashes[first].copy()
+        for t in range(1, span - 1):
+            extra = t < lengths[short_rows]
+            short_hashes[extra] = short_hashes[extra] * MIX ^ word_hashes[first[extra] + t]
+    return (np.concatenate([word_rows[starts], short_rows]),
+            np.concatenate([hashes, short_hashes]))
+
+def permute_hashes(hashes, seed):
+    """
+    Permutarea `seed` a hash-urilor pe 64 de biți (finalizatorul splitmix64 după XOR cu
+    `seed`): fiecare bit al rezultatului depinde de toți biții intrării, deci minimele
+    permutărilor diferite sunt practic independente.
+    """
+    z = hashes ^ seed
+    with np.errstate(over='ignore'):
+        z = (z ^ (z >> np.uint64(30))) * SPLITMIX_1
+        z = (z ^ (z >> np.uint64(27))) * SPLITMIX_2
+    return z ^ (z >> np.uint64(31))
+
+def minhash_signatures(df, columns=None, num_perm=64, k=2, seed=1, chunk_size=50_000):
+    """
+    Semnăturile MinHash (`num_perm` valori uint32 per rând) ale mulțimii de shingle-uri din
+    toate câmpurile `columns`. Shingle-urile fiecărui câmp sunt marcate cu câmpul din care
+    provin, deci același text în câmpuri diferite nu se potrivește. Rândurile fără niciun
+    text au semnătura EMPTY. Rândurile sunt procesate în bucăți de `chunk_size`, ca memoria
+    temporară să nu depindă de mărimea setului.
+    """
+    if columns is None:
+        columns = [col for col in TEXT_COLUMNS if col in df.columns]
+    rng = np.random.default_rng(seed)
+    perm_seeds = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    field_salts = rng.integers(1, 1 << 63, size=len(columns), dtype=np.uint64)
+
+    signatures = np.full((len(df), num_perm), EMPTY, dtype=np.uint32)
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        rows, hashes = [], []
+        for salt, col in zip(field_salts, columns):
+            field_rows, field_hashes = field_shingles(chunk[col], k=k)
+            rows.append(field_rows)
+            hashes.append(field_hashes ^ salt)
+        rows = np.concatenate(rows)
+        if len(rows) == 0:
+            continue
+        hashes = np.concatenate(hashes)
+        order = np.argsort(rows, kind='stable')
+        rows, hashes = rows[order], hashes[order]
+        group_starts = np.flatnonzero(np.concatenate([[True], rows[1:] != rows[:-1]]))
+        group_rows = start + rows[group_starts]
+        # Din minimul fiecărei permutări se păstrează cei mai semnificativi 32 de biți
+        for perm, perm_seed in enumerate(perm_seeds):
+            minimum = np.minimum.reduceat(permute_hashes(hashes, perm_seed), group_starts)
+            signatures[group_rows, perm] = (minimum >> np.uint64(32)).astype(np.uint32)
+    return signatures
+
+def lsh_candidate_pairs(signatures, bands=16, max_bucket_size=50):
+    """
+    Perechile candidate (i, j), i < j, ale rândurilor care au aceeași bandă de semnătură în
+    cel puțin una din cele `bands` benzi (LSH). Fiecare rând este căutat doar în bucket-ul
+    lui, deci costul per rând nu depinde de mărimea setului. Bucket-urile mai mari decât
+    `max_bucket_size` (de ex. un text generic repetat) sunt ignorate.
+    """
+    n, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    valid = np.flatnonzero((signatures != EMPTY).any(axis=1))
+    codes = []
+    for band in range(bands):
+        band_values = signatures[valid, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64)
+        keys = np.full(len(valid), np.uint64(band), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for column in band_values.T:
+                keys = keys * MIX ^ column
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        _, group_index, group_sizes = np.unique(sorted_keys, return_inverse=True, return_counts=True)
+        eligible = group_sizes[group_index] <= max_bucket_size
+        # Toate perechile din bucket: elementul de pe poziția p cu cele de pe pozițiile p + d
+        for d in range(1, max_bucket_size):
+            same = (sorted_keys[d:] == sorted_keys[:-d]) & eligible[:-d]
+            if not same.any():
+                break
+            i, j = valid[order[:-d][same]], valid[order[d:][same]]
+            codes.append(np.minimum(i, j).astype(np.int64) * n + np.maximum(i, j))
+    if not codes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codes = np.unique(np.concatenate(codes))
+    return codes // n, codes % n
+
+def estimated_jaccard(signatures, first, second, chunk_size=1_000_000):
+    """Similaritatea Jaccard estimată: proporția valorilor MinHash egale ale celor două rânduri."""
+    similarity = np.empty(len(first), dtype=np.float64)
+    for start in range(0, len(first), chunk_size):
+        i, j = first[start:start + chunk_size], second[start:start + chunk_size]
+        similarity[start:start + len(i)] = (signatures[i] == signatures[j]).mean(axis=1)
+    return similarity
+
+@instrumented('text_similarity', rows=lambda df, *args, **kwargs: len(df))
+def text_duplicate_pairs(df, columns=None, threshold=0.7, num_perm=64, bands=16, k=2, max_bucket_size=50, seed=1):
+    """
+    Perechile de rânduri cu text aproape identic în câmpurile `columns` (implicit
+    TEXT_COLUMNS): semnături MinHash, candidați din LSH și filtrare după similaritatea
+    Jaccard estimată (cel puțin `threshold`). Cu `bands` benzi de `num_perm / bands` valori,
+    perechile cu similaritate în jur de (1 / bands) ** (bands / num_perm) sau mai mare
+    ajung aproape sigur candidate.
+
+    Returnează un DataFrame cu pozițiile rândurilor ('first_row', 'second_row') și
+    similaritatea estimată ('jaccard'), ordonat descrescător după similaritate.
+    """
+    signatures = minhash_signatures(df, columns=columns, num_perm=num_perm, k=k, seed=seed)
+    first, second = lsh_candidate_pairs(signatures, bands=bands, max_bucket_size=max_bucket_size)
+    similarity = estimated_jaccard(signatures, first, second)
+    keep = similarity >= threshold
+    pairs = pd.DataFrame({'first_row': first[keep], 'second_row': second[keep], 'jaccard': similarity[keep]})
+    return pairs.sort_values(['jaccard', 'first_row', 'second_row'], ascending=[False, True, True],
+                             ignore_index=True)
+
+def pair_report(df, pairs, columns=('company_name',)):
+    """
+    Perechile de text duplicat cu valorile din `columns` ale ambelor rânduri
+    (coloanele first_<coloană> și second_<coloană>), pentru rapoarte.
+    """
+    report = pairs.copy()
+    for col in columns:
+        if col in df.columns:
+            values = df[col].astype(object).to_numpy()
+            report[f'first_{col}'] = values[pairs['first_row'].to_numpy()]
+            report[f'second_{col}'] = values[pairs['second_row'].to_numpy()]
+    return report
@@ -0,0 +1,220 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import re
+
+# Pattern-ul pentru caracterele eliminate: tot ce nu este literă, cifră, '_' sau spațiu.
+# Varianta Python este folosită pentru valori individuale, iar varianta RE2
+# (folosită de Arrow) scrie explicit clasele Unicode, pentru că în RE2 '\w' și '\s' sunt
+# doar ASCII: spațiile Unicode (\p{Z}, de ex. NBSP) și '\x0b', '\x1c'-'\x1f', '\x85',
+# pe care Python le consideră spații, sunt păstrate la fel ca în preprocess_text.
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+ARROW_NON_WORD_PATTERN = r'[^\p{L}\p{N}_\s\p{Z}\x0b\x1c-\x1f\x85]'
+
+def preprocess_text(text):
+    if pd.isna(text):
+        return ""
+    text = str(text).lower()
+    text = NON_WORD_PATTERN.sub('', text)
+    return text.strip()
+
+def normalize_array(array):
+    """
+    Normalizează un array Arrow de text dintr-o singură trecere prin kernel-urile Arrow:
+    lowercase, eliminarea caracterelor speciale și a spațiilor de la capete.
+    Valorile lipsă devin șir gol, la fel ca în preprocess_text.
+    """
+    if not pa.types.is_string(array.type) and not pa.types.is_large_string(array.type):
+        array = pc.cast(array, pa.large_string())
+    array = pc.utf8_lower(array)
+    array = pc.replace_substring_regex(array, ARROW_NON_WORD_PATTERN, '')
+    array = pc.utf8_trim_whitespace(array)
+    return pc.fill_null(array, '')
+
+def normalize_series(series):
+    """
+    Varianta vectorizată a preprocess_text pentru o coloană întreagă.
+    Returnează o serie `string[pyarrow]` cu același index.
+    """
+    if not isinstance(series.dtype, pd.StringDtype) or series.dtype.storage != 'pyarrow':
+        series = series.astype('string[pyarrow]')
+    normalized = normalize_array(pa.array(series, from_pandas=True))
+    return pd.Series(pd.array(normalized, dtype='string[pyarrow]'),
+                     index=series.index, name=series.name)
+
+def text_columns(df):
+    """Returnează coloanele de tip text (object / string) ale unui DataFrame."""
+    return [col for col in df.columns
+            if df[col].dtype == object or isinstance(df[col].dtype, pd.StringDtype)]
+
+def normalize_columns(df, columns=None):
+    """
+    Normalizează mai multe coloane text deodată și returnează un DataFrame nou
+    (cel primit nu este modificat). Implicit sunt normalizate toate coloanele text.
+    """
+    if columns is None:
+        columns = text_columns(df)
+    normalized = df.copy()
+    for col in columns:
+        normalized[col] = normalize_series(df[col])
+    return normalized
+
+# Domeniile de nivel doi sub care se înregistrează numele (acme.co.uk, shop.com.au)
+SECOND_LEVEL_PATTERN = r'\.(?:co|com|net|org|gov|edu|ac|or|ne|go)\.[a-z]{2}$'
+# Platformele care găzduiesc site-urile mai multor companii ca subdomenii (acme.wixsite.com):
+# domeniul înregistrat păstrează și eticheta din fața lor
+SHARED_HOST_SUFFIXES = ['wixsite.com', 'github.io', 'gitlab.io', 'blogspot.com', 'wordpress.com',
+                        'weebly.com', 'squarespace.com', 'webflow.io', 'myshopify.com', 'business.site',
+                        'herokuapp.com', 'netlify.app', 'vercel.app', 'pages.dev', 'azurewebsites.net',
+                        'tumblr.com', 'jimdofree.com', 'godaddysites.com', 'ueniweb.com']
+# Rețelele sociale și catalogele, unde pagina companiei este doar o cale (facebook.com/acme):
+# domeniul lor nu identifică o companie, deci nu devine cheie
+SOCIAL_HOSTS = ['facebook.com', 'fb.com', 'instagram.com', 'linkedin.com', 'twitter.com', 'x.com',
+                'youtube.com', 'youtu.be', 'tiktok.com', 'pinterest.com', 'yelp.com', 'google.com',
+                'goo.gl', 'bit.ly', 'linktr.ee', 'wa.me', 't.me', 'vk.com']
+
+def _host_alternation(hosts):
+    """Alternativa RE2 dintre host-urile date, ca grup fără captură."""
+    return '(?:' + '|'.join(re.escape(host) for host in hosts) + ')'
+
+# Host-ul este unul din cele date sau un subdomeniu al lui
+SHARED_HOST_PATTERN = r'(?:^|\.)' + _host_alternation(SHARED_HOST_SUFFIXES) + '$'
+SOCIAL_HOST_PATTERN = r'(?:^|\.)' + _host_alternation(SOCIAL_HOSTS) + '$'
+# Adresele IP (v4) nu sunt domenii
+IP_HOST_PATTERN = r'^\d+(?:\.\d+)*$'
+# Separatorul valorilor din coloanele cu liste (all_domains, phone_numbers, emails, ...)
+LIST_SEPARATOR = '|'
+
+# Coloanele din care provine fiecare tip de cheie; cele cu liste sunt despărțite în valori
+KEY_SOURCES = {
+    'domain': ['website_url', 'website_domain', 'domains', 'all_domains'],
+    'email': ['primary_email', 'emails', 'other_emails'],
+    'phone': ['primary_phone', 'phone_numbers']
+}
+LIST_COLUMNS = ['domains', 'all_domains', 'emails', 'other_emails', 'phone_numbers']
+
+def _text_array(values):
+    """Array Arrow `large_string`, lowercase și fără spații la capete."""
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        values = pa.array(values.astype('string[pyarrow]'), from_pandas=True)
+    return pc.utf8_trim_whitespace(pc.utf8_lower(pc.cast(values, pa.large_string())))
+
+def canonical_domain_array(values):
+    """
+    Domeniul înregistrat dintr-un URL sau un nume de domeniu: fără schemă, utilizator,
+    port, cale, 'www.' și subdomenii ("https://www.shop.acme.co.uk/x" -> "acme.co.uk").
+    Pe platformele comune (SHARED_HOST_SUFFIXES) se păstrează subdomeniul companiei
+    ("blog.acme.wixsite.com" -> "acme.wixsite.com"). Rețelele sociale (SOCIAL_HOSTS),
+    adresele IP și valorile care nu conțin un domeniu devin șir gol.
+    """
+    array = _text_array(values)
+    for pattern in (r'^[a-z][a-z0-9+.\-]*://', r'^[^/?#]*@', r'[/:?#].*$', r'^www\d*\.', r'\.+$'):
+        array = pc.replace_substring_regex(array, pattern, '')
+    last_three = pc.replace_substring_regex(array, r'^(?:.*\.)?([^.]+\.[^.]+\.[^.]+)$', r'\1')
+    last_two = pc.replace_substring_regex(array, r'^(?:.*\.)?([^.]+\.[^.]+)$', r'\1')
+    shared = pc.replace_substring_regex(
+        array, r'^(?:.*\.)?([^.]+\.' + _host_alternation(SHARED_HOST_SUFFIXES) + ')$', r'\1')
+    array = pc.if_else(pc.match_substring_regex(array, SHARED_HOST_PATTERN), shared,
+                       pc.if_else(pc.match_substring_regex(array, SECOND_LEVEL_PATTERN), last_three, last_two))
+    rejected = pc.or_(pc.match_substring_regex(array, SOCIAL_HOST_PATTERN),
+                      pc.match_substring_regex(array, IP_HOST_PATTERN))
+    array = pc.if_else(pc.and_(pc.match_substring(array, '.'), pc.invert(rejected)), array, '')
+    return pc.fill_null(array, '')
+
+def canonical_email_array(values):
+    """Adresa de email lowercase, fără 'mailto:'; valorile fără forma nume@domeniu devin șir gol."""
+    array = pc.replace_substring_regex(_text_array(values), r'^mailto:', '')
+    array = pc.if_else(pc.match_substring_regex(array, r'^[^@\s]+@[^@\s]+\.[^@\s]+$'), array, '')
+    return pc.fill_null(array, '')
+
+def canonical_phone_array(values):
+    """
+    Numărul de telefon în forma E.164 ('+' urmat de 8-15 cifre) când are prefix internațional
+    ('+' sau '00'); un număr național (fără prefix, deci fără țară cunoscută) păstrează doar
+    cifrele, fără '0' inițial. Extensiile ('x', 'ext', '#') sunt eliminate, iar valorile
+    cu prea puține sau prea multe cifre devin șir gol.
+    """
+    array = pc.replace_substring_regex(_text_array(values), r'(?:x|ext|#).*$', '')
+    international = pc.match_substring_regex(array, r'^(?:\+|00)')
+    digits = pc.replace_substring_regex(array, r'\D', '')
+    international_digits = pc.replace_substring_regex(digits, r'^00', '')
+    national_digits = pc.replace_substring_regex(digits, r'^0+', '')
+    length = pc.utf8_length(digits)
+    array = pc.if_else(
+        international,
+        pc.if_else(pc.and_(pc.greater_equal(pc.utf8_length(international_digits), 8),
+                           pc.less_equal(pc.utf8_length(international_digits), 15)),
+                   pc.replace_substring_regex(international_digits, r'^', '+'), ''),
+        pc.if_else(pc.and_(pc.greater_equal(length, 6), pc.less_equal(length, 15)), national_digits, ''))
+    return pc.fill_null(array, '')
+
+CANONICALIZERS = {
+    'domain': canonical_domain_array,
+    'email': canonical_email_array,
+    'phone': canonical_phone_array
+}
+
+def split_list_values(series, separator=LIST_SEPARATOR):
+    """
+    Valorile individuale ale unei coloane cu liste ('a.com | b.com' sau liste reale):
+    returnează pozițiile rândurilor și array-ul Arrow al valorilor, câte una pe element.
+    """
+    array = pa.array(series.astype(object) if series.dtype == object else series.astype('string[pyarrow]'),
+                     from_pandas=True)
+    if not pa.types.is_list(array.type) and not pa.types.is_large_list(array.type):
+        array = pc.split_pattern(pc.cast(array, pa.large_string()), separator)
+    rows = pc.list_parent_indices(array).to_numpy(zero_copy_only=False)
+    return rows, pc.cast(pc.list_flatten(array), pa.large_string())
+
+def canonical_values(df, kind, columns=None):
+    """
+    Valorile canonice de tipul `kind` ('domain', 'email', 'phone') din toate coloanele sursă
+    prezente (implicit KEY_SOURCES[kind]), cu listele despărțite în valori: un DataFrame
+    lung cu poziția rândului ('row') și valoarea ('value'), fără valori goale sau repetate.
+    """
+    if columns is None:
+        columns = KEY_SOURCES[kind]
+    canonicalize = CANONICALIZERS[kind]
+    frames = []
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if col in LIST_COLUMNS:
+            rows, values = split_list_values(df[col])
+        else:
+            rows, values = np.arange(len(df)), pa.array(df[col].astype('string[pyarrow]'), from_pandas=True)
+        values = canonicalize(values).to_numpy(zero_copy_only=False)
+        frames.append(pd.DataFrame({'row': rows, 'value': values}))
+    if not frames:
+        return pd.DataFrame({'row': pd.Series(dtype='int64'), 'value': pd.Series(dtype=object)})
+    values = pd.concat(frames, ignore_index=True)
+    return values[values['value'] != ''].drop_duplicates(ignore_index=True)
+
+def canonical_keys(df, kind, columns=None):
+    """
+    Cheile compacte pentru join-uri pe hash: ca canonical_values, dar cu valoarea înlocuită
+    de hash-ul ei pe 64 de biți ('key', uint64), deci join-urile compară doar întregi.
+    """
+    values = canonical_values(df, kind, columns)
+    keys = pd.util.hash_pandas_object(values['value'], index=False).to_numpy()
+    return pd.DataFrame({'row': values['row'].to_numpy(dtype=np.int64), 'key': keys})
+
+def frequent_keys(keys, max_group_size):
+    """Hash-urile care apar de mai mult de `max_group_size` ori (de ex. un email generic comun)."""
+    counts = keys['key'].value_counts()
+    return set(counts.index[counts > max_group_size])
+
+# Tipul de cheie canonică al fiecărei coloane folosite ca cheie exactă
+KEY_KINDS = {col: kind for kind, columns in KEY_SOURCES.items() for col in columns}
+
+def normalize_key(series, column):
+    """
+    Valorile normalizate ale unei chei de potrivire exactă: coloanele de domeniu, email
+    și telefon trec prin canonicalizatorul tipului lor (vezi CANONICALIZERS), restul
+    prin normalize_series. Valorile lipsă devin șir gol.
+    """
+    if column not in KEY_KINDS:
+        return normalize_series(series)
+    array = CANONICALIZERS[KEY_KINDS[column]](pa.array(series.astype('string[pyarrow]'), from_pandas=True))
+    return pd.Series(pd.array(array, dtype='string[pyarrow]'), index=series.index, name=series.name)
@@ -0,0 +1,35 @@
+import numpy as np
+
+# rapidfuzz este importat în funcții, doar de etapele care compară efectiv șiruri
+
+def ratio(str1, str2):
+    """Similaritatea fuzz.ratio (0-100, rotunjită la întreg) pentru o singură pereche."""
+    from rapidfuzz import fuzz
+    return int(round(fuzz.ratio(str1, str2)))
+
+def ratio_pairs(left, right, workers=-1):
+    """
+    Calculează fuzz.ratio element cu element pentru două liste de aceeași lungime.
+    Scorurile sunt calculate de rapidfuzz în afara GIL-ului, pe `workers` fire
+    (-1 = toate nucleele), și sunt rotunjite la întreg ca în `ratio`, deci
+    rezultatul nu depinde de numărul de fire.
+    """
+    if len(left) == 0:
+        return np.empty(0, dtype=np.int64)
+    from rapidfuzz import process, fuzz
+    scores = process.cpdist(left, right, scorer=fuzz.ratio, workers=workers)
+    return np.rint(scores).astype(np.int64)
+
+def score_index_pairs(strings, pairs, workers=-1, chunk_size=1_000_000):
+    """
+    Scorurile fuzz.ratio pentru perechile de indici (i, j) din `strings`, în ordinea perechilor.
+    Perechile sunt procesate în bucăți de `chunk_size`, ca memoria să rămână limitată.
+    """
+    pairs = list(pairs)
+    scores = np.empty(len(pairs), dtype=np.int64)
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start + chunk_size]
+        left = [strings[i] for i, _ in chunk]
+        right = [strings[j] for _, j in chunk]
+        scores[start:start + len(chunk)] = ratio_pairs(left, right, workers=workers)
+    return scores
@@ -0,0 +1,91 @@
+import pandas as pd
+import numpy as np
+from Incarcare import iter_batches
+from Normalizare import normalize_columns
+from Schite import sketch_partition, merge_sketches, sketch_summary
+from Instrumentare import instrumented
+
+def factorize_values(series):
+    """
+    Codifică valorile coloanei într-o singură trecere prin tabelul de hash (valorile lipsă = -1).
+    Valorile nehashabile (liste / array-uri) sunt codificate după forma lor text.
+    """
+    try:
+        return pd.factorize(series)
+    except TypeError:
+        return pd.factorize(series.map(str).where(series.notna()))
+
+def profile_column(series, top_k=5):
+    """
+    Profilul unei coloane, calculat dintr-o singură codificare a valorilor:
+    valori lipsă, valori distincte, masca de duplicate (ca duplicated(keep=False)),
+    numărul de valori care se repetă și cele mai frecvente `top_k` valori.
+    """
+    codes, uniques = factorize_values(series)
+    present = codes >= 0
+    counts = np.bincount(codes[present], minlength=len(uniques))
+    missing = int(len(codes) - present.sum())
+
+    # Valorile lipsă sunt considerate egale între ele, la fel ca în DataFrame.duplicated
+    duplicate_mask = np.full(len(codes), missing > 1)
+    duplicate_mask[present] = counts[codes[present]] > 1
+
+    top = np.argsort(-counts, kind='stable')[:top_k]
+    top_values = pd.Series(counts[top], index=pd.Index(uniques)[top], name='count')
+
+    return {
+        'dtype': series.dtype,
+        'rows': len(codes),
+        'missing': missing,
+        'nunique': len(uniques),
+        'duplicate_mask': pd.Series(duplicate_mask, index=series.index),
+        'duplicates': int(duplicate_mask.sum()),
+        'duplicated_values': int((counts > 1).sum()),
+        'top_values': top_values
+    }
+
+@instrumented('profiling', rows=lambda df, *args, **kwargs: len(df))
+def profile_columns(df, columns=None, top_k=5):
+    """
+    Profilează toate coloanele cerute (implicit toate) și returnează un dicționar
+    coloană -> profil, refolosit apoi de etapele de raportare în locul
+    recalculării nunique / isnull / duplicated / value_counts.
+    """
+    if columns is None:
+        columns = df.columns
+    return {col: profile_column(df[col], top_k=top_k) for col in columns}
+
+def stream_profile(parquet_path, columns=None, batch_size=65536, normalize=False, top_k=5, precision=14):
+    """
+    Profilul coloanelor calculat în flux, lot cu lot (vezi Incarcare.iter_batches și
+    profile_batches), deci memoria este limitată la un lot plus schițele.
+    """
+    return profile_batches(iter_batches(parquet_path, columns=columns, batch_size=batch_size),
+                           normalize=normalize, top_k=top_k, precision=precision)
+
+def profile_batches(batches, normalize=False, top_k=5, precision=14):
+    """
+    Profilul coloanelor acumulat dintr-o succesiune de loturi (DataFrame-uri cu aceleași
+    coloane): valorile lipsă sunt numărate exact, iar valorile distincte, duplicatele și cele
+    mai frecvente valori sunt estimate cu schițele din Schite.py. Cu `normalize=True` valorile
+    text sunt normalizate înainte (Normalizare.normalize_columns), ca variantele de scriere
+    să conteze ca duplicate; loturile primite nu sunt modificate.
+    """
+    capacity = top_k * 10
+    sketches = None
+    missing = None
+    rows = 0
+    for batch in batches:
+        batch_missing = batch.isnull().sum()
+        if normalize:
+            batch = normalize_columns(batch).where(batch.notna())
+        batch_sketches = sketch_partition(batch, list(batch.columns), precision, capacity)
+        sketches = batch_sketches if sketches is None else merge_sketches(sketches, batch_sketches, capacity)
+        missing = batch_missing if missing is None else missing + batch_missing
+        rows += len(batch)
+
+    if sketches is None:
+        return pd.DataFrame()
+    summary = sketch_summary(sketches, rows - missing, top_k=top_k)
+    summary.insert(1, 'Valori Lipsă', missing.to_numpy())
+    return summary
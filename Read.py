@@ -1,25 +1,23 @@
-import pandas as pd 
-import numpy as np
-import matplotlib.pyplot as plt
 import pyarrow.parquet as pq 
+from Incarcare import DEFAULT_INPUT, DEFAULT_SECOND_INPUT, read_head
 
-# Citim fișierele parquet folosind pyarrow
-table1 = pq.read_table('Tensorflow.parquet')
-table2 = pq.read_table('veridion_entity_resolution_challenge.snappy.parquet')
+def preview_dataset(parquet_path, label):
+    """Afișează numărul de rânduri, coloanele și primele rânduri, fără să citească tot fișierul."""
+    # Numărul de rânduri îl luăm din metadatele parquet, fără să citim datele
+    rows = pq.read_metadata(parquet_path).num_rows
+    
+    # Pentru previzualizare citim doar primele rânduri din fișier
+    data_set = read_head(parquet_path)
+    
+    # Afișăm informații despre structura datelor
+    print(f"Informații despre setul de date ({label}):")
+    print(f"Număr de rânduri: {rows}")
+    print(f"Coloane: {data_set.columns.tolist()}")
+    print("\nPrimele câteva rânduri:")
+    print(data_set.head())
+    return data_set
 
-# Convertim în DataFrame pentru vizualizare mai ușoară
-data_set1 = table1.to_pandas()
-data_set2 = table2.to_pandas()
-
-# Afișăm informații despre structura datelor
-print("Informații despre primul set de date (Tensorflow):")
-print(f"Număr de rânduri: {len(data_set1)}")
-print(f"Coloane: {data_set1.columns.tolist()}")
-print("\nPrimele câteva rânduri:")
-print(data_set1.head())
-
-print("\nInformații despre al doilea set de date (Veridion):")
-print(f"Număr de rânduri: {len(data_set2)}")
-print(f"Coloane: {data_set2.columns.tolist()}")
-print("\nPrimele câteva rânduri:")
-print(data_set2.head())
\ No newline at end of file
+if __name__ == "__main__":
+    data_set1 = preview_dataset(DEFAULT_INPUT, 'Tensorflow')
+    print()
+    data_set2 = preview_dataset(DEFAULT_SECOND_INPUT, 'Veridion')
\ No newline at end of file
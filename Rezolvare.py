@@ -1,61 +1,113 @@
 import pandas as pd 
 import numpy as np
-import matplotlib.pyplot as plt
 import pyarrow.parquet as pq 
-from fuzzywuzzy import fuzz
-from collections import defaultdict
-import re
+from Incarcare import DEFAULT_INPUT, load_table, load_dataset, parquet_columns, iter_batches
+from Tipuri import optimize_dtypes
+from Profiler import profile_columns, profile_batches
+from Incremental import open_index, match_batch
+from Derivate import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB, load_derived
+from Export import open_workbook, write_sheet, write_table
+from MinHash import TEXT_COLUMNS, text_duplicate_pairs, pair_report
+from Grafice import pyplot
+from Instrumentare import instrumented, pipeline, stage
 from datetime import datetime
-import seaborn as sns
 import os
+import sys
 
-def preprocess_text(text):
-    if pd.isna(text):
-        return ""
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    return text.strip()
+def composite_key_hash(df, key_columns):
+    """
+    Calculează vectorizat un hash uint64 per rând peste coloanele cheie.
+    Coloanele cu valori nehashabile (liste / array-uri) sunt hashuite după forma lor text.
+    """
+    key_frame = df[key_columns]
+    try:
+        return pd.util.hash_pandas_object(key_frame, index=False)
+    except TypeError:
+        key_frame = key_frame.apply(lambda col: col.map(str) if col.dtype == object else col)
+        return pd.util.hash_pandas_object(key_frame, index=False)
 
-def identify_unique_and_duplicates(df, key_columns):
+@instrumented('exact_dedup', rows=lambda df, *args, **kwargs: len(df))
+def identify_unique_and_duplicates(df, key_columns, hashed=True, key_column=None):
     """
     Identifică și separă companiile unice și duplicate bazate pe coloanele cheie.
+
+    Implicit (hashed=True) cheia compusă este un hash uint64 calculat vectorizat,
+    în loc de un șir construit rând cu rând; cu hashed=False se folosește cheia text
+    '_'.join(...) de până acum. DataFrame-ul primit nu este modificat; dacă este dat
+    `key_column`, cheia este adăugată sub acest nume în rezultate, pentru refolosire.
     """
     # Creăm un ID compus din coloanele cheie
-    df['composite_key'] = df[key_columns].apply(lambda x: '_'.join(x.astype(str)), axis=1)
+    if hashed:
+        composite_key = composite_key_hash(df, key_columns)
+    else:
+        composite_key = df[key_columns].apply(lambda x: '_'.join(map(str, x)), axis=1)
     
     # Identificăm duplicatele
-    duplicates_mask = df.duplicated(subset=['composite_key'], keep=False)
+    duplicates_mask = composite_key.duplicated(keep=False)
     
     # Separăm datele
     unique_companies = df[~duplicates_mask].copy()
     duplicate_companies = df[duplicates_mask].copy()
     
+    if key_column is not None:
+        unique_companies[key_column] = composite_key[~duplicates_mask]
+        duplicate_companies[key_column] = composite_key[duplicates_mask]
+    
     return unique_companies, duplicate_companies
 
-def analyze_and_separate_companies():
+# Pozițiile implicite ale coloanelor cheie în fișier (A, B, C, L, M, AL, AM, AN în Excel)
+DEFAULT_KEY_POSITIONS = [0, 1, 2, 11, 12, 37, 38, 39]
+
+def column_letter(position):
+    """Litera coloanei din Excel pentru poziția dată (0 -> A, 25 -> Z, 26 -> AA)."""
+    letter = ''
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        letter = chr(ord('A') + remainder) + letter
+    return letter
+
+def select_columns_to_analyze(columns, key_columns=None):
+    """
+    Coloanele cheie, ca dicționar literă Excel -> nume. Implicit sunt alese după poziția
+    lor în fișier (DEFAULT_KEY_POSITIONS); `key_columns` le alege după nume.
+    """
+    columns = list(columns)
+    if key_columns is None:
+        return {column_letter(position): columns[position] for position in DEFAULT_KEY_POSITIONS}
+    missing = [col for col in key_columns if col not in columns]
+    if missing:
+        raise ValueError(f"Coloanele cheie nu există în setul de date: {', '.join(missing)}")
+    return {column_letter(columns.index(col)): col for col in key_columns}
+
+@pipeline('analyze_and_separate_companies')
+def analyze_and_separate_companies(input_path=DEFAULT_INPUT, export_excel=False, export_format='xlsx',
+                                   key_columns=None, df=None):
+    """
+    Separă companiile unice de cele duplicate după coloanele cheie (implicit alese după
+    poziție, vezi select_columns_to_analyze) și salvează analiza detaliată. Un DataFrame
+    deja încărcat poate fi dat prin `df`, caz în care fișierul nu mai este citit.
+    """
     print("Începe analiza și separarea companiilor unice și duplicate...")
     
-    # Citim fișierul Excel
-    print("\nCitire fișier Excel...")
+    # Citim direct fișierul parquet (prin cache-ul Arrow), fără conversia în Excel
+    print("\nCitire fișier parquet...")
     try:
-        df = pd.read_excel('Tensorflow.xlsx')
+        if df is None:
+            with stage('read_parquet') as record:
+                table = load_table(input_path)
+                record['rows'] = table.num_rows
+            with stage('to_pandas', rows=table.num_rows):
+                df = table.to_pandas()
+        df = optimize_dtypes(df)
         print(f"Număr total de rânduri: {len(df)}")
         print(f"Număr total de coloane: {len(df.columns)}")
     except Exception as e:
-        print(f"Eroare la citirea fișierului Excel: {str(e)}")
+        print(f"Eroare la citirea fișierului parquet: {str(e)}")
         return
     
     # Definim coloanele pentru analiză
-    columns_to_analyze = {
-        'A': df.columns[0],
-        'B': df.columns[1], 
-        'C': df.columns[2],  
-        'L': df.columns[11],
-        'M': df.columns[12], 
-        'AL': df.columns[37],
-        'AM': df.columns[38],
-        'AN': df.columns[39] 
-    }
+    columns_to_analyze = select_columns_to_analyze(df.columns, key_columns)
     
     # Identificăm companiile unice și duplicate
     key_columns = list(columns_to_analyze.values())
@@ -66,17 +118,25 @@ def analyze_and_separate_companies():
     print(f"Număr de companii unice: {len(unique_companies)}")
     print(f"Număr de companii duplicate: {len(duplicate_companies)}")
     
-    # Analizăm duplicatele pentru fiecare coloană
+    # Analizăm duplicatele pentru fiecare coloană, dintr-un singur profil al coloanelor
+    profiles = profile_columns(df, key_columns)
     duplicate_analysis = {}
     for col_letter, col_name in columns_to_analyze.items():
-        duplicates = df[df.duplicated(subset=[col_name], keep=False)]
+        profile = profiles[col_name]
         duplicate_analysis[col_letter] = {
             'column_name': col_name,
-            'total_duplicates': len(duplicates),
-            'unique_values': duplicates[col_name].nunique(),
-            'most_common': duplicates[col_name].value_counts().head(5).to_dict()
+            'total_duplicates': profile['duplicates'],
+            'unique_values': profile['duplicated_values'],
+            'most_common': profile['top_values'][profile['top_values'] > 1].to_dict()
         }
     
+    # Perechile cu descrieri, etichete și nume comerciale aproape identice (MinHash/LSH)
+    text_columns = [col for col in TEXT_COLUMNS if col in df.columns]
+    text_duplicates = None
+    if text_columns:
+        text_duplicates = pair_report(df, text_duplicate_pairs(df, text_columns))
+        print(f"Număr de perechi cu text similar: {len(text_duplicates)}")
+    
     # Salvăm rezultatele
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
@@ -84,17 +144,23 @@ def analyze_and_separate_companies():
     result_dir = f'company_analysis_{timestamp}'
     os.makedirs(result_dir, exist_ok=True)
     
-    # Salvăm companiile unice și duplicate în fișiere separate
-    unique_companies.to_excel(f'{result_dir}/unique_companies.xlsx', index=False)
-    duplicate_companies.to_excel(f'{result_dir}/duplicate_companies.xlsx', index=False)
+    # Salvăm companiile unice și duplicate în fișiere separate (parquet, iar exportul complet
+    # în `export_format` - xlsx în flux sau csv - doar la cerere)
+    write_table(unique_companies, f'{result_dir}/unique_companies')
+    write_table(duplicate_companies, f'{result_dir}/duplicate_companies')
+    if export_excel and export_format != 'parquet':
+        write_table(unique_companies, f'{result_dir}/unique_companies', export_format)
+        write_table(duplicate_companies, f'{result_dir}/duplicate_companies', export_format)
     
-    # Salvăm analiza detaliată
-    with pd.ExcelWriter(f'{result_dir}/detailed_analysis.xlsx') as writer:
+    # Salvăm analiza detaliată (foile sunt scrise în flux, vezi Export.py)
+    workbook = open_workbook(f'{result_dir}/detailed_analysis.xlsx')
+    try:
         # Statistici generale
-        pd.DataFrame({
-            'Metric': ['Total Companii', 'Companii Unice', 'Companii Duplicate'],
-            'Valoare': [len(df), len(unique_companies), len(duplicate_companies)]
-        }).to_excel(writer, sheet_name='Statistici Generale', index=False)
+        write_sheet(workbook, 'Statistici Generale', pd.DataFrame({
+            'Metric': ['Total Companii', 'Companii Unice', 'Companii Duplicate', 'Perechi Text Similar'],
+            'Valoare': [len(df), len(unique_companies), len(duplicate_companies),
+                        len(text_duplicates) if text_duplicates is not None else 0]
+        }))
         
         # Analiza duplicatelor pe coloane
         duplicate_stats = []
@@ -105,22 +171,37 @@ def analyze_and_separate_companies():
                 'Valori Unice în Duplicate': stats['unique_values'],
                 'Cele mai comune valori': str(list(stats['most_common'].items())[:3])
             })
-        pd.DataFrame(duplicate_stats).to_excel(writer, sheet_name='Analiza Duplicatelor', index=False)
+        write_sheet(workbook, 'Analiza Duplicatelor', pd.DataFrame(duplicate_stats))
+        
+        # Perechile cu text similar (pozițiile rândurilor, similaritatea Jaccard estimată și numele)
+        if text_duplicates is not None and len(text_duplicates):
+            write_sheet(workbook, 'Duplicate_Text', text_duplicates)
         
-        # Exemple de duplicate pentru fiecare coloană
-        for col_letter, col_name in columns_to_analyze.items():
-            duplicates = df[df.duplicated(subset=[col_name], keep=False)].sort_values(col_name)
-            if len(duplicates) > 0:
-                duplicates.to_excel(writer, sheet_name=f'Duplicate_{col_letter}', index=False)
+        # Exemple de duplicate pentru fiecare coloană, doar dacă exportul complet este cerut:
+        # ca foi în analiza detaliată sau, pentru 'parquet' / 'csv', ca fișiere separate
+        if export_excel:
+            for col_letter, col_name in columns_to_analyze.items():
+                duplicates = df[profiles[col_name]['duplicate_mask']].sort_values(col_name)
+                if len(duplicates) == 0:
+                    continue
+                if export_format == 'xlsx':
+                    write_sheet(workbook, f'Duplicate_{col_letter}', duplicates)
+                else:
+                    write_table(duplicates, f'{result_dir}/Duplicate_{col_letter}', export_format)
+    finally:
+        with stage('excel_close'):
+            workbook.close()
     
     # Creăm vizualizări
     # 1. Distribuția companiilor unice vs duplicate
+    plt = pyplot()
     plt.figure(figsize=(10, 6))
     plt.pie([len(unique_companies), len(duplicate_companies)], 
             labels=['Companii Unice', 'Companii Duplicate'],
             autopct='%1.1f%%')
     plt.title('Distribuția Companiilor Unice vs Duplicate')
-    plt.savefig(f'{result_dir}/distribution_pie.png')
+    with stage('plot_distribution'):
+        plt.savefig(f'{result_dir}/distribution_pie.png')
     plt.close()
     
     # 2. Numărul de duplicate pe coloană
@@ -130,16 +211,142 @@ def analyze_and_separate_companies():
     plt.title('Numărul de Duplicate pe Coloană')
     plt.xlabel('Coloană')
     plt.ylabel('Număr de Duplicate')
-    plt.savefig(f'{result_dir}/duplicates_by_column.png')
+    with stage('plot_duplicates'):
+        plt.savefig(f'{result_dir}/duplicates_by_column.png')
     plt.close()
     
     print(f"\nRezultatele au fost salvate în directorul: {result_dir}")
     print("Fișiere generate:")
-    print("1. unique_companies.xlsx - Companiile unice")
-    print("2. duplicate_companies.xlsx - Companiile duplicate")
+    print("1. unique_companies.parquet - Companiile unice")
+    print("2. duplicate_companies.parquet - Companiile duplicate")
     print("3. detailed_analysis.xlsx - Analiza detaliată")
     print("4. distribution_pie.png - Vizualizare distribuție")
     print("5. duplicates_by_column.png - Vizualizare duplicate pe coloană")
 
+@pipeline('separate_companies_streaming')
+def separate_companies_streaming(input_path=DEFAULT_INPUT, result_dir=None, batch_size=65536, key_columns=None,
+                                 profile=True):
+    """
+    Separarea companiilor unice și duplicate în flux, pentru fișiere care nu încap în memorie.
+
+    Prima trecere citește pe loturi doar coloanele cheie și păstrează câte un hash uint64
+    pe rând (8 octeți / rând); masca de duplicate se calculează pe toate hash-urile.
+    Cu `profile=True`, în aceeași trecere este acumulat și profilul coloanelor cheie, cu
+    valorile normalizate (Profiler.profile_batches), salvat în `column_profile.csv`.
+    A doua trecere citește loturile complete ca tabele Arrow și le scrie direct în
+    fișierele parquet ale companiilor unice și duplicate.
+    """
+    print("Începe separarea în flux a companiilor unice și duplicate...")
+    key_columns = list(select_columns_to_analyze(parquet_columns(input_path), key_columns).values())
+    
+    # 1. Hash-urile cheii compuse (din valorile originale) și profilul, lot cu lot
+    key_hashes = []
+    def hashed_batches():
+        for batch in iter_batches(input_path, columns=key_columns, batch_size=batch_size):
+            key_hashes.append(composite_key_hash(batch, key_columns).to_numpy())
+            yield batch
+    if profile:
+        column_profile = profile_batches(hashed_batches(), normalize=True)
+    else:
+        column_profile = None
+        for _ in hashed_batches():
+            pass
+    key_hashes = np.concatenate(key_hashes) if key_hashes else np.empty(0, dtype=np.uint64)
+    duplicates_mask = pd.Series(key_hashes).duplicated(keep=False).to_numpy()
+    print(f"Număr total de companii: {len(duplicates_mask)}")
+    print(f"Număr de companii unice: {int((~duplicates_mask).sum())}")
+    print(f"Număr de companii duplicate: {int(duplicates_mask.sum())}")
+    
+    # 2. Rândurile complete, scrise lot cu lot în cele două fișiere
+    if result_dir is None:
+        result_dir = f'company_analysis_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    os.makedirs(result_dir, exist_ok=True)
+    schema = pq.read_schema(input_path)
+    offset = 0
+    with pq.ParquetWriter(f'{result_dir}/unique_companies.parquet', schema) as unique_writer, \
+         pq.ParquetWriter(f'{result_dir}/duplicate_companies.parquet', schema) as duplicate_writer:
+        for table in iter_batches(input_path, batch_size=batch_size, to_pandas=False):
+            batch_mask = duplicates_mask[offset:offset + table.num_rows]
+            offset += table.num_rows
+            unique_writer.write_table(table.filter(~batch_mask))
+            duplicate_writer.write_table(table.filter(batch_mask))
+    if column_profile is not None:
+        print("\nProfilul coloanelor cheie (valori normalizate, aproximativ):")
+        print(column_profile[['Coloană', 'Valori Lipsă', 'Valori Distincte (aprox.)', 'Rânduri Duplicate (aprox.)']])
+        write_table(column_profile, f'{result_dir}/column_profile', 'csv')
+    
+    print(f"\nRezultatele au fost salvate în directorul: {result_dir}")
+    return result_dir
+
+@pipeline('analyze_and_separate_incremental')
+def analyze_and_separate_incremental(input_path=DEFAULT_INPUT, index_path='entity_index.sqlite',
+                                     result_dir='incremental_results', similarity_threshold=85, workers=-1,
+                                     key_columns=None, df=None, use_cache=True, cache_dir=DEFAULT_CACHE_DIR,
+                                     max_cache_mb=DEFAULT_CACHE_SIZE_MB):
+    """
+    Deduplicarea incrementală a unui lot nou: rândurile sunt potrivite doar cu indexul
+    persistent al rulărilor anterioare (vezi Incremental.py), iar rezultatele lotului
+    sunt adăugate ca fișiere noi în `result_dir`/unique_companies și
+    `result_dir`/duplicate_companies, fără să fie recalculat istoricul.
+    Un lot deja încărcat (cu tipurile din fișier) poate fi dat prin `df`; cu `use_cache`
+    numele preprocesate vin din cache-ul fișierului (Derivate.py), deci `df` trebuie să
+    conțină toate rândurile lui, nefiltrate.
+    """
+    print("Începe deduplicarea incrementală a lotului nou...")
+    
+    print("\nCitire fișier parquet...")
+    try:
+        if df is None:
+            df = load_dataset(input_path)
+        print(f"Număr de rânduri în lot: {len(df)}")
+    except Exception as e:
+        print(f"Eroare la citirea fișierului parquet: {str(e)}")
+        return
+    
+    # Hash-ul cheii este calculat înainte de optimizarea tipurilor, ca să nu depindă de tipurile
+    # alese pentru fiecare lot și să rămână comparabil cu indexul
+    key_columns = list(select_columns_to_analyze(df.columns, key_columns).values())
+    key_hashes = composite_key_hash(df, key_columns)
+    df = optimize_dtypes(df)
+    
+    conn = open_index(index_path)
+    try:
+        names = df['company_name'] if 'company_name' in df.columns else None
+        normalized_names = None
+        if names is not None and use_cache:
+            derived = load_derived(input_path, cache_dir=cache_dir, max_size_mb=max_cache_mb,
+                                   columns=['name_normalized'])
+            if len(derived) == len(df) and 'name_normalized' in derived.columns:
+                normalized_names = derived['name_normalized']
+        cluster_ids, duplicates_mask = match_batch(conn, key_hashes, names, threshold=similarity_threshold,
+                                                   workers=workers, normalized_names=normalized_names)
+    finally:
+        conn.close()
+    
+    df['cluster_id'] = cluster_ids
+    unique_companies = df[~duplicates_mask]
+    duplicate_companies = df[duplicates_mask]
+    
+    print(f"\nRezultate identificare:")
+    print(f"Număr de companii noi (unice): {len(unique_companies)}")
+    print(f"Număr de companii duplicate (deja în index sau repetate în lot): {len(duplicate_companies)}")
+    
+    # Adăugăm rezultatele lotului la ieșirile existente
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    os.makedirs(f'{result_dir}/unique_companies', exist_ok=True)
+    os.makedirs(f'{result_dir}/duplicate_companies', exist_ok=True)
+    unique_companies.to_parquet(f'{result_dir}/unique_companies/batch_{timestamp}.parquet', index=False)
+    duplicate_companies.to_parquet(f'{result_dir}/duplicate_companies/batch_{timestamp}.parquet', index=False)
+    
+    print(f"\nRezultatele lotului au fost adăugate în directorul: {result_dir}")
+    return unique_companies, duplicate_companies
+
 if __name__ == "__main__":
-    analyze_and_separate_companies()
+    if '--incremental' in sys.argv:
+        analyze_and_separate_incremental()
+    elif '--streaming' in sys.argv:
+        separate_companies_streaming()
+    elif '--csv' in sys.argv:
+        analyze_and_separate_companies(export_excel=True, export_format='csv')
+    else:
+        analyze_and_separate_companies(export_excel='--excel' in sys.argv)
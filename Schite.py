@@ -0,0 +1,145 @@
+import pandas as pd
+import numpy as np
+
+# Schițe (sketches) cu memorie limitată pentru profilarea aproximativă a coloanelor.
+# Fiecare partiție produce o schiță, iar schițele se combină fără a reciti datele.
+
+def tree_reduce(parts, combine, *args):
+    """
+    Combină rezultatele parțiale (obiecte dask delayed, câte unul pe partiție) două câte două,
+    în arbore, cu `combine(a, b, *args)`; returnează obiectul delayed al rezultatului final.
+    Niciun pas nu primește mai mult de două rezultate parțiale odată.
+    """
+    import dask
+    while len(parts) > 1:
+        merged = [dask.delayed(combine)(parts[i], parts[i + 1], *args) for i in range(0, len(parts) - 1, 2)]
+        if len(parts) % 2:
+            merged.append(parts[-1])
+        parts = merged
+    return parts[0]
+
+def hash_values(series):
+    """Hash uint64 pentru valorile nenule ale coloanei (valorile nehashabile după forma text)."""
+    values = series.dropna()
+    try:
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    except TypeError:
+        return pd.util.hash_pandas_object(values.map(str), index=False).to_numpy()
+
+def _bit_length(values):
+    """Numărul de biți semnificativi pentru fiecare valoare uint64 (exact, vectorizat)."""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    length += (values > 0).astype(np.uint8)
+    return length
+
+def hll_registers(hashes, precision=14):
+    """
+    Registrele HyperLogLog (2**precision octeți) pentru un vector de hash-uri.
+    Primii `precision` biți aleg registrul, iar restul dau poziția primului bit 1.
+    """
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    if len(hashes) == 0:
+        return registers
+    hashes = hashes.astype(np.uint64)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << (64 - precision)) - 1)
+    rank = (64 - precision) - _bit_length(remainder).astype(np.int64) + 1
+    np.maximum.at(registers, index, rank.astype(np.uint8))
+    return registers
+
+def hll_merge(registers1, registers2):
+    """Combină două schițe HyperLogLog (maximul pe registru)."""
+    return np.maximum(registers1, registers2)
+
+def hll_estimate(registers):
+    """Estimează numărul de valori distincte din registrele HyperLogLog."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros > 0:
+        # Corecția pentru cardinalități mici (linear counting)
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+def space_saving(series, capacity):
+    """
+    Schiță SpaceSaving pentru cele mai frecvente valori ale unei partiții:
+    păstrează cel mult `capacity` contoare valoare -> (număr, eroare maximă).
+    `floor` este cel mai mic contor păstrat când schița este plină (0 altfel) și
+    limitează numărul de apariții al oricărei valori care nu a fost păstrată.
+    """
+    try:
+        counts = series.value_counts()
+    except TypeError:
+        counts = series.dropna().map(str).value_counts()
+    floor = 0
+    if len(counts) > capacity:
+        counts = counts.iloc[:capacity]
+        floor = int(counts.iloc[-1])
+    return {
+        'counters': {value: (int(count), 0) for value, count in counts.items()},
+        'floor': floor
+    }
+
+def space_saving_merge(summary1, summary2, capacity):
+    """
+    Combină două schițe SpaceSaving: o valoare lipsă dintr-o schiță plină primește
+    pragul acelei schițe ca număr și ca eroare. Se păstrează cele mai mari `capacity` contoare.
+    """
+    merged = {}
+    for value in set(summary1['counters']) | set(summary2['counters']):
+        count1, error1 = summary1['counters'].get(value, (summary1['floor'], summary1['floor']))
+        count2, error2 = summary2['counters'].get(value, (summary2['floor'], summary2['floor']))
+        merged[value] = (count1 + count2, error1 + error2)
+
+    ordered = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)
+    floor = summary1['floor'] + summary2['floor']
+    if len(ordered) > capacity:
+        floor = max(floor, ordered[capacity - 1][1][0])
+        ordered = ordered[:capacity]
+    return {'counters': dict(ordered), 'floor': floor}
+
+def sketch_partition(df, columns, precision=14, capacity=100):
+    """Schițele HyperLogLog și SpaceSaving pentru fiecare coloană a unei partiții."""
+    return {
+        col: {
+            'hll': hll_registers(hash_values(df[col]), precision),
+            'top': space_saving(df[col], capacity)
+        }
+        for col in columns
+    }
+
+def merge_sketches(sketches1, sketches2, capacity=100):
+    """Combină schițele a două partiții, coloană cu coloană."""
+    return {
+        col: {
+            'hll': hll_merge(sketches1[col]['hll'], sketches2[col]['hll']),
+            'top': space_saving_merge(sketches1[col]['top'], sketches2[col]['top'], capacity)
+        }
+        for col in sketches1
+    }
+
+def sketch_summary(sketches, non_null_counts, top_k=10):
+    """
+    Tabelul final al profilului aproximativ: valori distincte estimate, rânduri
+    duplicate estimate (rânduri nenule - valori distincte) și cele mai frecvente
+    valori care se repetă, cu numărul lor (limită superioară).
+    """
+    rows = []
+    for col, sketch in sketches.items():
+        distinct = min(hll_estimate(sketch['hll']), int(non_null_counts[col]))
+        top = sorted(sketch['top']['counters'].items(), key=lambda item: item[1][0], reverse=True)
+        top = [(value, count) for value, (count, _) in top if count > 1][:top_k]
+        rows.append({
+            'Coloană': col,
+            'Valori Distincte (aprox.)': distinct,
+            'Rânduri Duplicate (aprox.)': max(int(non_null_counts[col]) - distinct, 0),
+            'Cele mai frecvente valori': str(top)
+        })
+    return pd.DataFrame(rows)
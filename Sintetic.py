@@ -0,0 +1,224 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Coloanele setului de date, în ordinea din fișierul original (vezi data_structure_info.txt);
+# toate sunt text, ca în Tensorflow.parquet
+SCHEMA_COLUMNS = [
+    'company_name', 'company_legal_names', 'company_commercial_names', 'main_country_code',
+    'main_country', 'main_region', 'main_city_district', 'main_city', 'main_postcode',
+    'main_street', 'main_street_number', 'main_latitude', 'main_longitude',
+    'main_address_raw_text', 'locations', 'num_locations', 'company_type', 'year_founded',
+    'lnk_year_founded', 'short_description', 'long_description', 'business_tags',
+    'business_model', 'product_type', 'naics_vertical', 'naics_2022_primary_code',
+    'naics_2022_primary_label', 'naics_2022_secondary_codes', 'naics_2022_secondary_labels',
+    'main_business_category', 'main_industry', 'main_sector', 'primary_phone', 'phone_numbers',
+    'primary_email', 'emails', 'other_emails', 'website_url', 'website_domain', 'website_tld',
+    'website_language_code', 'facebook_url', 'twitter_url', 'instagram_url', 'linkedin_url',
+    'ios_app_url', 'android_app_url', 'youtube_url', 'tiktok_url', 'alexa_rank',
+    'sics_codified_industry', 'sics_codified_industry_code', 'sics_codified_subsector',
+    'sics_codified_subsector_code', 'sics_codified_sector', 'sics_codified_sector_code',
+    'sic_codes', 'sic_labels', 'isic_v4_codes', 'isic_v4_labels', 'nace_rev2_codes',
+    'nace_rev2_labels', 'created_at', 'last_updated_at', 'website_number_of_pages',
+    'generated_description', 'generated_business_tags', 'status', 'domains', 'all_domains',
+    'revenue', 'revenue_type', 'employee_count', 'employee_count_type', 'inbound_links_count'
+]
+
+SCHEMA = pa.schema([(col, pa.string()) for col in SCHEMA_COLUMNS])
+
+# Silabele din care sunt construite numele (unice) ale companiilor generate
+SYLLABLES = np.array([consonant + vowel for consonant in 'bdgklmnprstvz' for vowel in 'aeiou'])
+NAME_SYLLABLES = 5
+NAME_SPACE = len(SYLLABLES) ** NAME_SYLLABLES
+NAME_MULTIPLIER = 48271  # prim cu NAME_SPACE, deci permutarea id-urilor este bijectivă
+
+NAME_NOUNS = np.array(['Liquors', 'Auto', 'Consulting', 'Software', 'Bakery', 'Logistics',
+                       'Dental', 'Construction', 'Travel', 'Studio', 'Foods', 'Energy'])
+LEGAL_SUFFIXES = np.array(['', '', ' LLC', ' GmbH', ' SRL', ' Inc', ' Ltd'])
+
+# (cod țară, țară, prefix telefonic, TLD, [(oraș, regiune, latitudine, longitudine)])
+COUNTRIES = [
+    ('US', 'United States', '1', 'com', [('New York', 'New York', 40.7128, -74.0060),
+                                         ('Austin', 'Texas', 30.2672, -97.7431),
+                                         ('Pawleys Island', 'South Carolina', 33.4332, -79.1214)]),
+    ('DE', 'Germany', '49', 'de', [('Berlin', 'Berlin', 52.5200, 13.4050),
+                                   ('Munich', 'Bavaria', 48.1351, 11.5820)]),
+    ('RO', 'Romania', '40', 'ro', [('Cluj-Napoca', 'Cluj', 46.7712, 23.6236),
+                                   ('Bucharest', 'Bucharest', 44.4268, 26.1025)]),
+    ('GB', 'United Kingdom', '44', 'co.uk', [('London', 'England', 51.5072, -0.1276)]),
+    ('AU', 'Australia', '61', 'com.au', [('City Of Wyndham', 'Victoria', -37.8354, 144.6647)]),
+    ('CZ', 'Czechia', '420', 'cz', [('Otrokovice', 'Zlín', 49.1993, 17.5453)])
+]
+
+# (categorie, industrie, sector, cod NAICS, coduri SIC)
+CATEGORIES = [
+    ('Beer & Liquor Stores', 'Beverages', 'Food & Beverages', '445320', '5921 | 5181'),
+    ('Automobile Dealers & Manufacturers', 'Automobile Dealers & Manufacturers', 'Automotive', '441120', '5521'),
+    ('Management Consulting', 'Consulting', 'Professional Services', '541611', '8742'),
+    ('Software Development', 'Software', 'Information Technology', '541511', '7371'),
+    ('Bakeries', 'Food Production', 'Food & Beverages', '311811', '5461'),
+    ('Freight Transport', 'Logistics', 'Transportation', '484121', '4213')
+]
+
+TAGS = np.array(['Retail', 'Wine', 'Delivery', 'Online Shopping', 'B2B', 'Consulting', 'Software',
+                 'Manufacturing', 'Wholesale', 'Repairs', 'Catering', 'Cloud Services'])
+
+# Proporția de valori lipsă pe coloanele generate
+MISSING_RATES = {
+    'company_legal_names': 0.6, 'main_postcode': 0.2, 'main_street': 0.3, 'main_latitude': 0.1,
+    'main_longitude': 0.1, 'year_founded': 0.5, 'long_description': 0.7, 'business_tags': 0.2,
+    'primary_phone': 0.3, 'primary_email': 0.5, 'website_url': 0.15, 'alexa_rank': 0.6,
+    'revenue': 0.5, 'employee_count': 0.4, 'linkedin_url': 0.5
+}
+
+def _pseudo_words(ids):
+    """Cuvinte unice (pronunțabile) pentru id-uri de entități diferite, construite din silabe."""
+    ids = (np.asarray(ids, dtype=np.int64) * NAME_MULTIPLIER) % NAME_SPACE
+    parts = []
+    for _ in range(NAME_SYLLABLES):
+        parts.append(pd.Series(SYLLABLES[ids % len(SYLLABLES)]))
+        ids = ids // len(SYLLABLES)
+    return parts[0].str.cat(parts[1:]).str.capitalize()
+
+def _choice(rng, values, size):
+    """Alegere aleatoare vectorizată dintr-un vector de valori."""
+    return np.asarray(values)[rng.integers(0, len(values), size)]
+
+def _text(values):
+    """Vector numeric -> Series text (ca în fișierul original)."""
+    return pd.Series(values).astype(str)
+
+def _base_companies(n_rows, rng, id_offset=0):
+    """Generează `n_rows` entități distincte, cu toate coloanele schemei."""
+    df = pd.DataFrame(index=pd.RangeIndex(n_rows), columns=SCHEMA_COLUMNS, dtype=object)
+
+    word = _pseudo_words(np.arange(id_offset, id_offset + n_rows))
+    noun = _choice(rng, NAME_NOUNS, n_rows)
+    name = word + ' ' + noun + _choice(rng, LEGAL_SUFFIXES, n_rows)
+    df['company_name'] = name
+    df['company_legal_names'] = name
+    df['company_commercial_names'] = word + ' ' + noun
+
+    # Locația: țară, oraș și coordonate în jurul centrului orașului
+    cities = [(code, country, prefix, tld, city, region, lat, lon)
+              for code, country, prefix, tld, city_list in COUNTRIES
+              for city, region, lat, lon in city_list]
+    city_index = rng.integers(0, len(cities), n_rows)
+    code, country, prefix, tld, city, region, lat, lon = (np.array(values)[city_index] for values in zip(*cities))
+    df['main_country_code'] = code
+    df['main_country'] = country
+    df['main_region'] = region
+    df['main_city'] = city
+    df['main_postcode'] = _text(rng.integers(10000, 99999, n_rows))
+    df['main_street'] = _choice(rng, ['Main Street', 'Ocean Highway', 'Berauer Straße', 'Strada Mare'], n_rows)
+    df['main_street_number'] = _text(rng.integers(1, 500, n_rows))
+    latitude = lat.astype(np.float64) + rng.normal(0, 0.05, n_rows)
+    longitude = lon.astype(np.float64) + rng.normal(0, 0.05, n_rows)
+    df['main_latitude'] = _text(np.round(latitude, 7))
+    df['main_longitude'] = _text(np.round(longitude, 7))
+    df['main_address_raw_text'] = (df['main_street_number'] + ' ' + df['main_street'] + ', '
+                                   + df['main_city'] + ', ' + df['main_country'])
+    df['locations'] = (df['main_country_code'] + ', ' + df['main_country'] + ', ' + df['main_region']
+                       + ', ' + df['main_city'] + ', ' + df['main_latitude'] + ', ' + df['main_longitude'])
+    df['num_locations'] = '1'
+
+    # Activitatea
+    category_index = rng.integers(0, len(CATEGORIES), n_rows)
+    category, industry, sector, naics, sic = (np.array(values)[category_index] for values in zip(*CATEGORIES))
+    df['company_type'] = _choice(rng, ['Private', 'Public'], n_rows)
+    df['year_founded'] = _text(rng.integers(1950, 2024, n_rows))
+    df['main_business_category'] = category
+    df['main_industry'] = industry
+    df['main_sector'] = sector
+    df['naics_2022_primary_code'] = naics
+    df['sic_codes'] = sic
+    df['business_tags'] = (pd.Series(_choice(rng, TAGS, n_rows)) + ' | ' + _choice(rng, TAGS, n_rows)
+                           + ' | ' + _choice(rng, TAGS, n_rows))
+    df['short_description'] = (name + ' is a ' + pd.Series(category).str.lower() + ' based in '
+                               + df['main_city'] + ', ' + df['main_country'] + '.')
+    df['long_description'] = df['short_description'] + ' Services: ' + df['business_tags'].str.replace(' | ', ', ')
+
+    # Contact și web
+    domain = word.str.lower() + pd.Series(noun).str.lower() + '.' + tld
+    df['website_domain'] = domain
+    df['website_tld'] = tld
+    df['website_url'] = 'https://www.' + domain + '/'
+    df['domains'] = domain
+    df['all_domains'] = domain + ' | ' + word.str.lower() + '.com'
+    df['primary_email'] = 'info@' + domain
+    df['emails'] = df['primary_email']
+    df['primary_phone'] = '+' + pd.Series(prefix) + _text(rng.integers(100_000_000, 999_999_999, n_rows))
+    df['phone_numbers'] = df['primary_phone']
+    df['linkedin_url'] = 'http://www.linkedin.com/company/' + word.str.lower()
+    df['alexa_rank'] = _text(rng.integers(1, 10_000_000, n_rows))
+    df['revenue'] = _text(rng.integers(10_000, 50_000_000, n_rows))
+    df['employee_count'] = _text(rng.integers(1, 5000, n_rows))
+    df['created_at'] = '2023-06-30 17:31:17.732'
+    df['last_updated_at'] = '2024-11-23 01:22:57.613'
+    df['status'] = 'Active'
+
+    for col, rate in MISSING_RATES.items():
+        df.loc[rng.random(n_rows) < rate, col] = None
+    return df
+
+def _near_duplicates(df, rng):
+    """
+    Variante ale unor rânduri existente, cum apar în practică: numele scris cu majuscule,
+    cu o greșeală de tastare, cu altă formă juridică sau cu punctuație în plus;
+    website, email și telefon scrise diferit.
+    """
+    df = df.copy()
+    name = df['company_name'].astype(str)
+    kind = rng.integers(0, 4, len(df))
+    variants = [
+        name.str.upper(),
+        name.str[:2] + name.str[3] + name.str[2] + name.str[4:],
+        name.str.replace(r' (LLC|GmbH|SRL|Inc|Ltd)$', '', regex=True) + ' Ltd.',
+        name.str.replace(' ', ', ', n=1) + '.'
+    ]
+    df['company_name'] = np.choose(kind, [variant.to_numpy(dtype=object) for variant in variants])
+    df['website_url'] = df['website_url'].str.replace('https://www.', 'http://', regex=False)
+    df['primary_email'] = df['primary_email'].str.upper()
+    df['primary_phone'] = df['primary_phone'].str.replace('+', '00', regex=False)
+    return df
+
+def generate_companies(n_rows, duplicate_rate=0.1, near_duplicate_rate=0.1, seed=0, id_offset=0):
+    """
+    Generează un set sintetic de `n_rows` companii cu schema din data_structure_info.txt.
+
+    O proporție `duplicate_rate` din rânduri sunt copii exacte ale altor rânduri, iar
+    `near_duplicate_rate` sunt variante apropiate (vezi _near_duplicates); restul sunt
+    entități distincte. Rândurile sunt amestecate. `id_offset` deplasează id-urile
+    entităților, ca loturile generate separat să nu aibă nume comune.
+    """
+    rng = np.random.default_rng(seed)
+    n_duplicates = int(round(n_rows * duplicate_rate))
+    n_near = int(round(n_rows * near_duplicate_rate))
+    n_base = n_rows - n_duplicates - n_near
+    if n_base <= 0 and n_rows > 0:
+        raise ValueError("duplicate_rate + near_duplicate_rate trebuie să fie mai mic decât 1")
+
+    base = _base_companies(n_base, rng, id_offset)
+    sources = rng.integers(0, n_base, n_duplicates + n_near) if n_base else np.empty(0, dtype=np.int64)
+    duplicates = base.iloc[sources[:n_duplicates]]
+    near = _near_duplicates(base.iloc[sources[n_duplicates:]], rng)
+
+    df = pd.concat([base, duplicates, near], ignore_index=True)
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+def write_synthetic_parquet(path, n_rows, duplicate_rate=0.1, near_duplicate_rate=0.1, seed=0,
+                            chunk_size=1_000_000):
+    """
+    Scrie setul sintetic direct în fișierul parquet, pe loturi de `chunk_size` rânduri,
+    deci și seturile de zeci de milioane de rânduri pot fi generate cu memorie limitată.
+    Duplicatele sunt generate în interiorul fiecărui lot. Returnează numărul de rânduri scrise.
+    """
+    written = 0
+    with pq.ParquetWriter(path, SCHEMA) as writer:
+        for chunk, start in enumerate(range(0, n_rows, chunk_size)):
+            rows = min(chunk_size, n_rows - start)
+            df = generate_companies(rows, duplicate_rate, near_duplicate_rate, seed=seed + chunk, id_offset=start)
+            writer.write_table(pa.Table.from_pandas(df, schema=SCHEMA, preserve_index=False))
+            written += rows
+    return written
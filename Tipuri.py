@@ -0,0 +1,84 @@
+import pandas as pd
+from Instrumentare import instrumented
+
+# Câmpuri cu puține valori distincte, păstrate ca `category`
+CATEGORICAL_COLUMNS = [
+    'main_country_code', 'main_country', 'main_region', 'company_type',
+    'website_tld', 'website_language_code', 'main_sector', 'main_industry',
+    'main_business_category', 'naics_vertical', 'business_model',
+    'revenue_type', 'employee_count_type', 'status', 'sics_codified_sector',
+    'sics_codified_sector_code'
+]
+
+# Câmpuri numerice salvate ca text în fișierul parquet
+NUMERIC_COLUMNS = {
+    'main_latitude': 'float64',
+    'main_longitude': 'float64',
+    'revenue': 'float64',
+    'year_founded': 'Int64',
+    'lnk_year_founded': 'Int64',
+    'num_locations': 'Int64',
+    'alexa_rank': 'Int64',
+    'website_number_of_pages': 'Int64',
+    'employee_count': 'Int64',
+    'inbound_links_count': 'Int64'
+}
+
+def memory_usage_mb(df):
+    """Memoria ocupată de DataFrame (inclusiv conținutul șirurilor), în MB."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def to_numeric_column(series, dtype):
+    """
+    Convertește o coloană text la tipul numeric dat; valorile care nu sunt numere devin lipsă.
+    O coloană 'Int64' care conține totuși zecimale rămâne 'float64'.
+    """
+    values = pd.to_numeric(series, errors='coerce')
+    if dtype == 'Int64':
+        present = values.dropna()
+        if (present % 1 != 0).any():
+            return values.astype('float64')
+    return values.astype(dtype)
+
+@instrumented('optimize_dtypes', rows=lambda df, *args, **kwargs: len(df))
+def optimize_dtypes(df, categorical_columns=None, numeric_columns=None, max_category_ratio=0.5, verbose=True):
+    """
+    Convertește coloanele la tipuri compacte și returnează un DataFrame nou:
+    - câmpurile numerice salvate ca text devin float64 / Int64;
+    - câmpurile cu puține valori distincte devin `category`
+      (doar dacă au cel mult `max_category_ratio` valori distincte per rând);
+    - restul coloanelor text de tip `object` devin `string[pyarrow]`.
+    Coloanele care lipsesc din DataFrame sau care au deja tipul compact sunt ignorate,
+    deci funcția poate fi apelată din nou pe un DataFrame deja optimizat.
+    """
+    if categorical_columns is None:
+        categorical_columns = CATEGORICAL_COLUMNS
+    if numeric_columns is None:
+        numeric_columns = NUMERIC_COLUMNS
+
+    memory_before = memory_usage_mb(df)
+    optimized = df.copy(deep=False)
+
+    for col, dtype in numeric_columns.items():
+        if col in optimized.columns and not pd.api.types.is_numeric_dtype(optimized[col]):
+            optimized[col] = to_numeric_column(optimized[col], dtype)
+
+    for col in categorical_columns:
+        if col in optimized.columns and col not in numeric_columns:
+            values = optimized[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                continue
+            if len(values) and values.nunique() / len(values) <= max_category_ratio:
+                optimized[col] = values.astype('category')
+
+    for col in optimized.columns:
+        values = optimized[col]
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+            optimized[col] = values.astype('string[pyarrow]')
+
+    if verbose:
+        memory_after = memory_usage_mb(optimized)
+        print(f"Memorie înainte de optimizarea tipurilor: {memory_before:.2f} MB")
+        print(f"Memorie după optimizarea tipurilor: {memory_after:.2f} MB")
+
+    return optimized
@@ -0,0 +1,206 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from Incarcare import DEFAULT_INPUT, DEFAULT_SECOND_INPUT, load_table, parquet_columns
+from Tipuri import optimize_dtypes
+from Instrumentare import StageReport, stage
+
+# Interfața unică în linie de comandă: rulează orice combinație de etape într-un singur
+# proces, pe un singur set de date încărcat o dată, de ex.
+#   python dataforge.py structure similarity separate --input Tensorflow.parquet --workers 8
+
+class SharedDataset:
+    """
+    Setul de date citit o singură dată (cu filtrele date) și folosit de toate etapele.
+    `raw` păstrează tipurile din fișier (necesare pentru hash-urile indexului incremental),
+    iar `optimized` este varianta cu tipuri compacte (Tipuri.optimize_dtypes).
+    """
+    def __init__(self, input_path, filters=None):
+        self.input_path = input_path
+        self.filters = filters
+        self._raw = None
+        self._optimized = None
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            with stage('read_parquet') as record:
+                table = load_table(self.input_path, filters=self.filters)
+                record['rows'] = table.num_rows
+            with stage('to_pandas', rows=table.num_rows):
+                self._raw = table.to_pandas()
+        return self._raw
+
+    @property
+    def optimized(self):
+        if self._optimized is None:
+            self._optimized = optimize_dtypes(self.raw)
+        return self._optimized
+
+def parse_filters(values):
+    """Filtrele `coloană=valoare` din linia de comandă, în formatul pyarrow."""
+    filters = []
+    for value in values or []:
+        column, separator, expected = value.partition('=')
+        if not separator or not column:
+            raise argparse.ArgumentTypeError(f"Filtru invalid: {value} (formatul este coloană=valoare)")
+        filters.append((column, '==', expected))
+    return filters or None
+
+def run_preview(args, data):
+    from Read import preview_dataset
+    preview_dataset(args.input, 'set 1')
+    if args.second_input and os.path.exists(args.second_input):
+        print()
+        preview_dataset(args.second_input, 'set 2')
+
+def run_convert(args, data):
+    from Covert import convert_parquet_to_feather, convert_parquet_to_excel
+    paths = [path for path in (args.input, args.second_input) if path and os.path.exists(path)]
+    convert_parquet_to_feather(paths)
+    if args.convert_format:
+        convert_parquet_to_excel(export_format=args.convert_format, parquet_paths=paths)
+
+def run_structure(args, data):
+    from Analysis import analyze_companies
+    analyze_companies(input_path=args.input, df=data.optimized)
+
+def run_fields(args, data):
+    from Data_Procesing import analyze_company_data
+    load_second_dataset = args.load_second_dataset
+    if load_second_dataset and not os.path.exists(args.second_input):
+        print(f"Fișierul {args.second_input} nu există; al doilea set nu este încărcat")
+        load_second_dataset = False
+    analyze_company_data(similarity_threshold=args.threshold, workers=args.workers,
+                         load_second_dataset=load_second_dataset, input_path=args.input,
+                         second_path=args.second_input, geo_radius_km=args.geo_radius, df=data.optimized,
+                         use_cache=not args.no_cache and not data.filters, cache_dir=args.cache_dir,
+                         max_cache_mb=args.max_cache_mb)
+
+def run_similarity(args, data):
+    from Analiza import analyze_excel_duplicates
+    analyze_excel_duplicates(input_path=args.input, export_excel=args.export, similarity_mode=args.similarity_mode,
+                             sample_size=args.sample_size, workers=args.workers, export_format=args.export_format,
+                             key_columns=args.key_columns, df=data.optimized)
+
+def run_separate(args, data):
+    from Rezolvare import analyze_and_separate_companies
+    analyze_and_separate_companies(input_path=args.input, export_excel=args.export,
+                                   export_format=args.export_format, key_columns=args.key_columns,
+                                   df=data.optimized)
+
+def run_streaming(args, data):
+    from Rezolvare import separate_companies_streaming
+    separate_companies_streaming(input_path=args.input, batch_size=args.batch_size, key_columns=args.key_columns)
+
+def run_incremental(args, data):
+    from Rezolvare import analyze_and_separate_incremental
+    analyze_and_separate_incremental(input_path=args.input, index_path=args.index_path,
+                                     similarity_threshold=args.threshold, workers=args.workers,
+                                     key_columns=args.key_columns, df=data.raw,
+                                     use_cache=not args.no_cache and not data.filters, cache_dir=args.cache_dir,
+                                     max_cache_mb=args.max_cache_mb)
+
+def run_large(args, data):
+    from Dask import analyze_large_dataset
+    analyze_large_dataset(filters=data.filters, approximate=args.approximate, top_k=args.top_k,
+                          input_path=args.input)
+
+def run_link(args, data):
+    from Legaturi import link_datasets
+    from Export import write_table
+    if not os.path.exists(args.second_input):
+        print(f"Fișierul {args.second_input} nu există; etapa link este omisă")
+        return
+    link_table = link_datasets(left_path=args.input, right_path=args.second_input, threshold=args.threshold,
+                               batch_size=args.batch_size, workers=args.workers, use_cache=not args.no_cache,
+                               cache_dir=args.cache_dir, max_cache_mb=args.max_cache_mb,
+                               left_df=data.raw if data.filters else None)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = write_table(link_table, f'company_links_{timestamp}', args.export_format)
+    print(f"Tabelul de legături a fost salvat în '{path}'")
+
+# Etapele disponibile, în ordinea în care sunt afișate în ajutor
+STAGES = {
+    'preview': run_preview,
+    'convert': run_convert,
+    'structure': run_structure,
+    'fields': run_fields,
+    'similarity': run_similarity,
+    'separate': run_separate,
+    'streaming': run_streaming,
+    'incremental': run_incremental,
+    'large': run_large,
+    'link': run_link
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='dataforge',
+        description="Rulează etapele de analiză și deduplicare pe un singur set de date încărcat o dată.")
+    parser.add_argument('stages', nargs='+', choices=list(STAGES), metavar='etapă',
+                        help=f"Etapele de rulat, în ordine: {', '.join(STAGES)}")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help="Fișierul parquet analizat")
+    parser.add_argument('--second-input', default=DEFAULT_SECOND_INPUT, help="Al doilea fișier parquet")
+    parser.add_argument('--key-columns', nargs='+', default=None, metavar='COLOANĂ',
+                        help="Coloanele cheie, după nume (implicit cele de pe pozițiile A, B, C, L, M, AL, AM, AN)")
+    parser.add_argument('--filter', action='append', dest='filters', metavar='COLOANĂ=VALOARE',
+                        help="Citește doar rândurile cu valoarea dată (se poate repeta)")
+    parser.add_argument('--threshold', type=int, default=85, help="Pragul de similaritate a numelor (0-100)")
+    parser.add_argument('--geo-radius', type=float, default=None, metavar='KM',
+                        help="Etapa fields: compară numele doar între companiile aflate la cel mult KM km")
+    parser.add_argument('--workers', type=int, default=-1, help="Numărul de fire pentru potrivirea fuzzy (-1 = toate)")
+    parser.add_argument('--export', action='store_true', help="Exportul complet al duplicatelor")
+    parser.add_argument('--export-format', default='xlsx', choices=['xlsx', 'csv', 'parquet'])
+    parser.add_argument('--convert-format', choices=['xlsx', 'csv'], default=None,
+                        help="Pentru etapa convert: exportă și fișierele parquet în acest format")
+    parser.add_argument('--similarity-mode', default='sample', choices=['sample', 'exact'])
+    parser.add_argument('--sample-size', type=int, default=2000)
+    parser.add_argument('--load-second-dataset', action='store_true')
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--index-path', default='entity_index.sqlite')
+    parser.add_argument('--approximate', action='store_true', help="Profil aproximativ (schițe) pentru etapa large")
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--cache-dir', default='derived_cache',
+                        help="Cache-ul coloanelor derivate (etapele fields, incremental și link)")
+    parser.add_argument('--max-cache-mb', type=int, default=2048, help="Mărimea maximă a cache-ului, în MB")
+    parser.add_argument('--no-cache', action='store_true', help="Recalculează coloanele derivate, fără cache")
+    parser.add_argument('--report-dir', default='stage_reports', help="Directorul raportului pe etape")
+    parser.add_argument('--profile', action='store_true', help="Salvează și profilul cProfile al rulării")
+    parser.add_argument('--trace-memory', action='store_true', help="Urmărește alocările cu tracemalloc")
+    args = parser.parse_args(argv)
+    try:
+        args.filters = parse_filters(args.filters)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not os.path.exists(args.input):
+        parser.error(f"Fișierul {args.input} nu există")
+    if args.key_columns:
+        missing = [col for col in args.key_columns if col not in parquet_columns(args.input)]
+        if missing:
+            parser.error(f"Coloanele cheie nu există în {args.input}: {', '.join(missing)}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    data = SharedDataset(args.input, filters=args.filters)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report = StageReport('dataforge', output=os.path.join(args.report_dir, f'dataforge_{timestamp}.json'),
+                         profile=args.profile, trace_memory=args.trace_memory)
+    start_time = time.time()
+    try:
+        with report:
+            for name in args.stages:
+                print(f"\n=== Etapa: {name} ===")
+                STAGES[name](args, data)
+    finally:
+        print("\nProfil pe etape (dataforge):")
+        print(report.summary())
+        print(f"Raportul pe etape a fost salvat în '{report.save()}'")
+        print(f"Timpul total de execuție: {time.time() - start_time:.2f} secunde")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from Geografic import EARTH_RADIUS_KM, cell_keys, unit_vectors, geo_candidate_pairs, great_circle_km
+
+def coordinates_frame(latitude, longitude, names):
+    """Un set de companii cu coordonatele salvate ca text, ca în fișierele de intrare."""
+    return pd.DataFrame({'main_latitude': np.asarray(latitude).astype(str),
+                         'main_longitude': np.asarray(longitude).astype(str),
+                         'company_name': names})
+
+def offset_east(latitude, longitude, km):
+    """Punctul aflat la `km` km est de (latitude, longitude)."""
+    return latitude, longitude + np.degrees(km / (EARTH_RADIUS_KM * np.cos(np.radians(latitude))))
+
+def test_sparse_cells_match_brute_force():
+    rng = np.random.default_rng(0)
+    latitude = 44.43 + rng.uniform(-0.05, 0.05, 400)
+    longitude = 26.10 + rng.uniform(-0.05, 0.05, 400)
+    df = coordinates_frame(latitude, longitude, [f'firma {i}' for i in range(400)])
+
+    first, second, distance = geo_candidate_pairs(df, radius_km=1.0, max_cell_size=10_000)
+
+    vectors = unit_vectors(latitude, longitude)
+    i, j = np.triu_indices(len(df), k=1)
+    expected = great_circle_km(vectors, i, j) <= 1.0
+    assert set(zip(first.tolist(), second.tolist())) == set(zip(i[expected].tolist(), j[expected].tolist()))
+    assert (distance <= 1.0).all()
+
+def test_dense_cell_pair_across_cell_boundary():
+    radius_km = 1.0
+    # Un punct dintr-o celulă al cărui vecin aflat la 200 m est este în altă celulă
+    for step in range(200):
+        anchor = offset_east(44.43, 26.10, step * 0.05)
+        neighbour = offset_east(*anchor, 0.2)
+        keys = cell_keys(unit_vectors(np.array([anchor[0], neighbour[0]]),
+                                      np.array([anchor[1], neighbour[1]])), radius_km)
+        if keys[0] != keys[1]:
+            break
+    else:
+        raise AssertionError("Nu a fost găsită o margine de celulă")
+
+    # Celula punctului este densă: sute de companii la câțiva metri de el
+    rng = np.random.default_rng(1)
+    filler_latitude = anchor[0] + rng.uniform(-2e-5, 2e-5, 300)
+    filler_longitude = anchor[1] + rng.uniform(-2e-5, 2e-5, 300)
+    filler_keys = cell_keys(unit_vectors(filler_latitude, filler_longitude), radius_km)
+    assert (filler_keys == keys[0]).sum() > 200
+
+    latitude = np.concatenate([[anchor[0], neighbour[0]], filler_latitude])
+    longitude = np.concatenate([[anchor[1], neighbour[1]], filler_longitude])
+    names = ['brutaria ionescu srl', 'brutaria ionescu srl'] + [f'companie {i} {i * 7919}' for i in range(300)]
+    df = coordinates_frame(latitude, longitude, names)
+
+    first, second, _ = geo_candidate_pairs(df, radius_km=radius_km, max_cell_size=200, names=names)
+    assert (0, 1) in set(zip(first.tolist(), second.tolist()))
@@ -0,0 +1,16 @@
+import pandas as pd
+from Normalizare import normalize_series, preprocess_text
+
+# Toate caracterele pe care Python le consideră spații, inclusiv cele Unicode (NBSP, U+2003)
+UNICODE_WHITESPACE = [chr(code) for code in range(0x3001) if chr(code).isspace()]
+
+def test_normalize_series_matches_preprocess_text_on_unicode_whitespace():
+    values = ([f'Acme{space}S.R.L.{space}' for space in UNICODE_WHITESPACE] +
+              [f'{space}Brutăria{space}Ionescu,{space}' for space in UNICODE_WHITESPACE] +
+              ['Firma\x0b\x1c\x1d\x1e\x1fNoua', None])
+
+    normalized = normalize_series(pd.Series(values, dtype=object))
+
+    assert normalized.tolist() == [preprocess_text(value) for value in values]
+    # Spațiul neseparabil rămâne între cuvinte, nu le lipește
+    assert normalize_series(pd.Series(['Acme\u00a0Group'])).tolist() == ['acme\u00a0group']